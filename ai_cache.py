@@ -0,0 +1,111 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+# Case, whitespace and trailing punctuation don't change the question
+def normalize_question(question):
+    return ' '.join(question.lower().split()).rstrip('?!. ')
+
+
+# Stable hash of the market state an answer was based on; floats are
+# rounded to cents so numpy/float repr noise doesn't change it
+def market_fingerprint(*values):
+    def rounded(value):
+        if isinstance(value, dict):
+            return {str(k): rounded(v) for k, v in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [rounded(v) for v in value]
+        try:
+            return round(float(value), 2)
+        except (TypeError, ValueError):
+            return str(value)
+
+    payload = json.dumps(rounded(list(values)), sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def cache_key(question, fingerprint, context=''):
+    payload = f"{normalize_question(question)}\n{fingerprint}\n{context}"
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+# LRU + TTL cache of AI answers, optionally backed by a SQLite file so
+# answers survive restarts
+class ResponseCache:
+    def __init__(self, max_entries=256, ttl=3600, path=None, clock=time.time):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # key -> (created, answer)
+        self._lock = threading.Lock()
+        self._db = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("CREATE TABLE IF NOT EXISTS responses "
+                             "(key TEXT PRIMARY KEY, answer TEXT NOT NULL, created REAL NOT NULL)")
+            self._db.commit()
+
+    def get(self, key):
+        now = self.clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None and self._db is not None:
+                row = self._db.execute("SELECT created, answer FROM responses WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    entry = row
+                    self._store(key, entry)
+
+            if entry is not None and now - entry[0] > self.ttl:
+                self._drop(key)
+                self.evictions += 1
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, answer):
+        entry = (self.clock(), answer)
+        with self._lock:
+            self._store(key, entry)
+            if self._db is not None:
+                self._db.execute("INSERT OR REPLACE INTO responses (key, answer, created) VALUES (?, ?, ?)",
+                                 (key, answer, entry[0]))
+                self._db.execute("DELETE FROM responses WHERE created < ?", (entry[0] - self.ttl,))
+                self._db.commit()
+
+    def _store(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _drop(self, key):
+        self._entries.pop(key, None)
+        if self._db is not None:
+            self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._db.commit()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / total if total else 0.0,
+        }
@@ -0,0 +1,102 @@
+import json
+import os
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_BASE_URL = "https://api.openai.com/v1"
+
+SYSTEM_PROMPT = ("You are a professional technical analyst specializing in Fibonacci analysis and market trends. "
+                 "Provide clear, concise, and insightful analysis based on the provided data.")
+
+_session = None
+_session_lock = threading.Lock()
+
+
+class ChatCompletionError(Exception):
+    def __init__(self, status_code, text):
+        super().__init__(f"{status_code} - {text}")
+        self.status_code = status_code
+        self.text = text
+
+
+# One keep-alive connection pool shared by every session of the process
+def get_session():
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+            _session.mount("https://", adapter)
+            _session.mount("http://", adapter)
+        return _session
+
+
+def build_messages(context, question):
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": f"Context: {context}\n\nQuestion: {question}"}
+    ]
+
+
+# Stream a chat completion over the pooled session, yielding content as it
+# arrives. Stops early once `cancel_event` is set.
+def stream_chat_completion(api_key, messages, model="gpt-4o", base_url=None, timeout=30,
+                           cancel_event=None, session=None, temperature=0.7, max_tokens=500):
+    session = session or get_session()
+    base_url = base_url or os.environ.get("OPENAI_BASE_URL", DEFAULT_BASE_URL)
+    headers = {
+        "Content-Type": "application/json",
+        "Authorization": f"Bearer {api_key}"
+    }
+    data = {
+        "model": model,
+        "messages": messages,
+        "temperature": temperature,
+        "max_tokens": max_tokens,
+        "stream": True
+    }
+
+    response = session.post(f"{base_url}/chat/completions", headers=headers,
+                            data=json.dumps(data), stream=True, timeout=timeout)
+    try:
+        if response.status_code != 200:
+            raise ChatCompletionError(response.status_code, response.text)
+        response.encoding = "utf-8"
+
+        # Server-sent events: one "data: {json}" line per chunk, then "data: [DONE]"
+        for line in response.iter_lines(decode_unicode=True):
+            if cancel_event is not None and cancel_event.is_set():
+                return
+            if not line or not line.startswith("data:"):
+                continue
+            payload = line[len("data:"):].strip()
+            if payload == "[DONE]":
+                return
+            choices = json.loads(payload).get("choices") or [{}]
+            content = choices[0].get("delta", {}).get("content")
+            if content:
+                yield content
+    finally:
+        response.close()
+
+
+# Same streaming contract for an OpenAI SDK client
+def stream_openai_client(client, messages, model="gpt-4o", timeout=30, cancel_event=None,
+                         temperature=0.7, max_tokens=500):
+    stream = client.chat.completions.create(
+        model=model,
+        messages=messages,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        stream=True,
+        timeout=timeout
+    )
+    try:
+        for chunk in stream:
+            if cancel_event is not None and cancel_event.is_set():
+                return
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+    finally:
+        stream.close()
@@ -0,0 +1,69 @@
+import re
+
+# Rough local token count: words, punctuation marks and runs of up to three
+# digits each count as one token, which tracks GPT tokenizers closely for
+# numeric tables
+_TOKEN_PATTERN = re.compile(r"[A-Za-z]+|\d{1,3}|[^\sA-Za-z\d]")
+
+
+def estimate_tokens(text):
+    return len(_TOKEN_PATTERN.findall(text))
+
+
+def format_value(value, decimals=2):
+    if isinstance(value, str):
+        return value
+    if value is None or value != value:  # None or NaN
+        return '-'
+    return f"{float(value):.{decimals}f}"
+
+
+# Pipe-separated table: a header row, then one row per item
+def format_table(header, rows, decimals=2):
+    lines = ['|'.join(header)]
+    lines.extend('|'.join(format_value(value, decimals) for value in row) for row in rows)
+    return '\n'.join(lines)
+
+
+# Builds the prompt context from titled tables, keeping the highest-priority
+# sections that fit in `token_budget` tokens. Output is deterministic for the
+# same inputs.
+class ContextBuilder:
+    def __init__(self, token_budget=400, decimals=2):
+        self.token_budget = token_budget
+        self.decimals = decimals
+        self.sections = []
+
+    # Lower priority values are included first; ties keep insertion order
+    def add(self, title, header, rows, priority=0):
+        text = f"{title}\n{format_table(header, rows, self.decimals)}"
+        self.sections.append((priority, len(self.sections), title, text))
+        return self
+
+    def add_fibonacci(self, title, levels_by_direction, priority=0):
+        directions = list(levels_by_direction.items())
+        labels = list(directions[0][1]) if directions else []
+        rows = [[direction] + list(levels.values()) for direction, levels in directions]
+        return self.add(title, ['Dir'] + labels, rows, priority)
+
+    # Returns (context text, report) where the report lists the serialized
+    # size and which sections made it into the budget
+    def build(self):
+        included, dropped, used = [], [], 0
+        for _, _, title, text in sorted(self.sections):
+            tokens = estimate_tokens(text)
+            if used + tokens <= self.token_budget:
+                included.append((title, text))
+                used += tokens
+            else:
+                dropped.append(title)
+
+        context = '\n\n'.join(text for _, text in included)
+        report = {
+            'tokens': estimate_tokens(context),
+            'chars': len(context),
+            'budget': self.token_budget,
+            'included': [title for title, _ in included],
+            'dropped': dropped,
+        }
+        return context, report
@@ -1,12 +1,8 @@
-import streamlit as st
-import yfinance as yf
-import pandas as pd
-import numpy as np
-import plotly.graph_objects as go
-from datetime import datetime, timedelta
-import time
-from openai import OpenAI
 import os
+import threading
+import time
+from datetime import datetime
+import streamlit as st
 
 # Set page config
 st.set_page_config(
@@ -15,130 +11,241 @@ st.set_page_config(
     layout="wide"
 )
 
-# Initialize OpenAI client
-client = None
-
-# Title and description
+# Title and description. They are sent before the imports below, so a cold
+# worker paints the page while pandas and the analysis modules load.
 st.title("S&P 500 & NASDAQ 100 Technical Analysis Dashboard")
 st.markdown("This dashboard shows technical analysis for both S&P 500 and NASDAQ 100 indices including price data and Fibonacci retracement levels.")
 
+import pandas as pd
+from providers import YFinanceProvider
+from throttle import Backoff, CircuitBreaker, ThrottledProvider, TokenBucket
+from data_store import OHLCVStore
+from market_cache import MarketCache
+from resample import TIMEFRAMES
+from refresher import BackgroundRefresher
+from shared_snapshots import SharedSnapshots
+from timing import Timings
+from fib import RATIO_SETS, calculate_fibonacci_levels
+from charts import create_price_chart
+from intraday import INTERVALS, IntradayBoard, PollingSource, TickReplay
+from ai_cache import ResponseCache, cache_key, market_fingerprint
+from ai_context import ContextBuilder
+from ai_client import build_messages, stream_openai_client
+
+# One client (and its connection pool) per API key. The OpenAI SDK is
+# imported here, so it only loads once a question needs an answer.
+@st.cache_resource
+def get_openai_client(api_key):
+    from openai import OpenAI
+    return OpenAI(api_key=api_key)
+
 # Add OpenAI API key input in sidebar
 with st.sidebar:
     st.header("OpenAI Settings")
     api_key = st.text_input("Enter your OpenAI API Key", type="password")
     
-    if api_key:
-        try:
-            # Initialize the client with the API key
-            client = OpenAI(api_key=api_key)
-        except Exception as e:
-            st.error(f"Error initializing OpenAI client: {str(e)}")
+    ai_timeout = st.slider("AI Response Timeout (seconds)", 5, 120, 30)
+    context_budget = st.slider("AI Context Budget (tokens)", 100, 1000, 400, step=50)
+
+# Cache of AI answers, persisted to SQLite when AI_CACHE_PATH is set
+@st.cache_resource
+def get_response_cache():
+    return ResponseCache(max_entries=256, ttl=3600, path=os.environ.get("AI_CACHE_PATH"))
+
+# Per-stage latency histograms for this server process; FIB_TIMINGS=0 turns them off
+@st.cache_resource
+def get_timings():
+    return Timings(enabled=os.environ.get("FIB_TIMINGS", "1") != "0")
+
+timings = get_timings()
+# Stage times of this script run, shown in the sidebar timing panel
+run_timings = {}
+
+# Earliest selectable year; the cache always holds history from here
+EARLIEST_YEAR = 2008
 
 # Sidebar for date range selection
 st.sidebar.header("Settings")
-start_year = st.sidebar.slider("Start Year", 2008, 2024, 2008)
+
+# Daily history, or live intraday bars that update in place
+view_mode = st.sidebar.radio("Mode", ["Daily", "Intraday"])
+
+start_year = st.sidebar.slider("Start Year", EARLIEST_YEAR, 2024, EARLIEST_YEAR)
+
+# Anchor Fibonacci levels on the window extremes or on the latest swing points
+anchor_label = st.sidebar.radio("Fibonacci Anchor", ["Window High/Low", "Latest Swing"])
+fib_anchor = 'swing' if anchor_label == "Latest Swing" else 'range'
+swing_threshold = st.sidebar.slider("Swing Threshold (%)", 1, 30, 10, disabled=fib_anchor != 'swing') / 100
+
+# Plain retracements, or retracements plus the 127.2%/161.8%/261.8% extensions
+fib_ratios = RATIO_SETS[st.sidebar.radio("Fibonacci Ratios", list(RATIO_SETS))]
+
+# Bar timeframe; every level is precomputed, so switching needs no download
+timeframe_label = st.sidebar.radio("Timeframe", list(TIMEFRAMES), index=list(TIMEFRAMES).index("Bi-monthly"))
+timeframe = TIMEFRAMES[timeframe_label]
+
+# Candles at the selected timeframe, or full-resolution daily bars drawn with WebGL
+resolution_label = st.sidebar.radio("Chart Resolution", ["Candles", "Daily (WebGL)"])
+chart_mode = 'webgl' if resolution_label == "Daily (WebGL)" else 'candlestick'
+
+# Fixed point budget per WebGL chart: roughly one point per pixel of a half-width
+# chart in the wide layout (Streamlit doesn't tell the server the viewport size)
+CHART_POINTS = 1000
+
+# Intraday bar interval, a recorded tick file to replay instead of polling
+# Yahoo, and the pause between polls (0 replays as fast as it can draw)
+if view_mode == "Intraday":
+    intraday_interval = st.sidebar.radio("Bar Interval", list(INTERVALS))
+    replay_path = st.sidebar.text_input("Replay Tick File", os.environ.get("FIB_REPLAY_PATH", "")).strip()
+    poll_seconds = st.sidebar.slider("Poll Every (seconds)", 0, 60, 5)
+
+# Directory for the local bar store
+DATA_DIR = os.environ.get("FIB_DATA_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data"))
+
+# Directory of snapshots shared by every worker process on this host (optional)
+SHARED_DIR = os.environ.get("FIB_SHARED_DIR")
 
 # Calculate date range
-end_date = datetime.now()
 start_date = datetime(start_year, 1, 1)
 
-# Fetch data function with bi-monthly sampling
-@st.cache_data(ttl=3600)  # Cache data for 1 hour
-def fetch_data(ticker, start_date, end_date):
-    # Fetch data from yfinance with retries
-    max_retries = 3
-    for attempt in range(max_retries):
-        try:
-            data = yf.download(ticker, start=start_date, end=end_date, timeout=30)
-            break
-        except Exception as e:
-            if attempt == max_retries - 1:  # Last attempt
-                st.error(f"Failed to fetch data for {ticker} after {max_retries} attempts: {str(e)}")
-                return pd.DataFrame()
-            time.sleep(2)  # Wait before retrying
-    
-    # Check if the data is empty
-    if data.empty:
-        st.error(f"No data available for {ticker}")
-        return pd.DataFrame()
-    
-    # Debug: Print column names to see what's available
-    st.write(f"Columns for {ticker}: {data.columns.tolist()}")
+# Indices kept fresh in the background, and how often to check them (seconds)
+TRACKED_TICKERS = ("^GSPC", "^NDX")
+REFRESH_INTERVAL = 300
+
+# Layered cache over the local bar store, shared by every session
+@st.cache_resource
+def get_market_cache():
+    store = OHLCVStore(DATA_DIR)
+    # Stay under Yahoo's rate limit, back off when throttled and stop calling
+    # it for a while after repeated failures
+    provider = ThrottledProvider(YFinanceProvider(timeout=30),
+                                 limiter=TokenBucket(rate=2, burst=5),
+                                 backoff=Backoff(base=2, cap=60),
+                                 breaker=CircuitBreaker(failure_threshold=5, reset_timeout=300),
+                                 max_retries=3)
+    return MarketCache(store, provider, datetime(EARLIEST_YEAR, 1, 1))
+
+# Background worker that keeps the indices fresh; started once per server process.
+# With FIB_SHARED_DIR set, every worker maps the same published snapshots
+# and only the worker holding the publisher lock runs the refresher.
+@st.cache_resource
+def get_refresher():
+    def start_refresher(publisher=None):
+        return BackgroundRefresher(get_market_cache(), TRACKED_TICKERS, interval=REFRESH_INTERVAL,
+                                   timings=get_timings(), publisher=publisher).start()
+    if SHARED_DIR:
+        return SharedSnapshots(SHARED_DIR, start_refresher)
+    return start_refresher()
+
+# Read bars at the given timeframe for a batch of tickers from the published
+# snapshots, sliced to the selected start date. Only reads memory.
+def fetch_batch(tickers, start_date, freq='2ME'):
+    refresher = get_refresher()
+    refresher.track(tickers)
+    if not refresher.wait_ready(timeout=0):
+        with st.spinner("Loading market data..."):
+            refresher.wait_ready(timeout=120)
+    snapshots = refresher.snapshots(tickers)
+    if refresher.last_error and any(snapshot is not None for snapshot in snapshots.values()):
+        st.warning(f"Market data refresh failed ({refresher.last_error}); showing the last good data.")
     
-    # Print the last date in the data for debugging
-    st.write(f"Last date in raw data for {ticker}: {data.index[-1]}")
+    data = {}
+    for ticker in tickers:
+        snapshot = snapshots[ticker]
+        # Check if the data is empty
+        if snapshot is None or snapshot.daily.empty:
+            if refresher.last_error:
+                st.error(f"Failed to fetch data for {ticker}: {refresher.last_error}")
+            else:
+                st.error(f"No data available for {ticker}")
+            data[ticker] = pd.DataFrame()
+            continue
+        
+        # The start year only slices the snapshot
+        data[ticker] = snapshot.window(freq, start_date)
     
-    # Handle multi-level column names and resample
+    return data
+
+# Display names of the tracked indices
+INDEX_NAMES = {"^GSPC": "S&P 500", "^NDX": "NASDAQ 100"}
+
+# Intraday bars from Yahoo, rate limited like the daily provider and shared
+# by every session polling the same interval
+@st.cache_resource
+def get_intraday_provider(interval):
+    return ThrottledProvider(YFinanceProvider(timeout=30, interval=interval),
+                             limiter=TokenBucket(rate=2, burst=5),
+                             backoff=Backoff(base=2, cap=60),
+                             breaker=CircuitBreaker(failure_threshold=5, reset_timeout=300),
+                             max_retries=3)
+
+# This session's intraday bars, kept across reruns until the interval or
+# the source changes
+def get_intraday_board(interval, replay_path):
+    key = (interval, replay_path)
+    if st.session_state.get("intraday_key") != key:
+        source = TickReplay(replay_path, interval) if replay_path else PollingSource(get_intraday_provider(interval))
+        st.session_state["intraday_board"] = IntradayBoard(TRACKED_TICKERS, source)
+        st.session_state["intraday_key"] = key
+    return st.session_state["intraday_board"]
+
+# Intraday mode polls in a loop and redraws only the metric and chart
+# placeholders of tickers whose bars changed; the rest of the page is
+# never re-run
+if view_mode == "Intraday":
     try:
-        # Create a copy of the data with simplified column names
-        processed_data = pd.DataFrame()
-        
-        # Map the multi-level columns to single level
-        if isinstance(data.columns, pd.MultiIndex):
-            for col in ['Open', 'High', 'Low', 'Close', 'Volume']:
-                processed_data[col] = data[(col, ticker)]
+        board = get_intraday_board(intraday_interval, replay_path)
+    except OSError as e:
+        st.error(f"Could not read tick file {replay_path}: {e}")
+        st.stop()
+    status = st.empty()
+    panels = {}
+    for column, ticker in zip(st.columns(len(TRACKED_TICKERS)), TRACKED_TICKERS):
+        with column:
+            st.subheader(f"{INDEX_NAMES[ticker]} ({ticker}) {intraday_interval}")
+            panels[ticker] = (st.empty(), st.empty())
+
+    def draw_intraday(ticker):
+        series = board.series[ticker]
+        if not len(series):
+            return
+        metric, chart = panels[ticker]
+        stats = series.metrics()
+        metric.metric(f"{INDEX_NAMES[ticker]} Price", f"${stats['price']:,.2f}", f"{stats['change']:.2f}%")
+        fig = create_price_chart(series.frame(), series.levels('down', fib_ratios), series.levels('up', fib_ratios),
+                                 f"{INDEX_NAMES[ticker]} {intraday_interval} with Fibonacci Retracement Levels",
+                                 'webgl', CHART_POINTS)
+        chart.plotly_chart(fig, use_container_width=True)
+
+    # Bars the session already holds, then one poll per interval
+    for ticker in TRACKED_TICKERS:
+        draw_intraday(ticker)
+    while not board.exhausted:
+        try:
+            with timings.span("intraday_poll", run_timings):
+                changed = board.tick()
+        except Exception as e:
+            status.warning(f"Intraday poll failed ({e}); retrying in {poll_seconds} seconds.")
         else:
-            processed_data = data.copy()
-        
-        # Resample to bi-monthly data
-        resampled_data = processed_data.resample('2ME').agg({
-            'Open': 'first',
-            'High': 'max',
-            'Low': 'min',
-            'Close': 'last',
-            'Volume': 'sum'
-        })
-        
-        # Print the last date after resampling for debugging
-        st.write(f"Last date after resampling for {ticker}: {resampled_data.index[-1]}")
-        
-        return resampled_data
-        
-    except Exception as e:
-        st.error(f"Error processing data for {ticker}: {str(e)}")
-        st.write("Available columns:", data.columns.tolist())
-        return pd.DataFrame()
-
-# Calculate Fibonacci retracement levels
-def calculate_fibonacci_levels(data, direction='down'):
-    if data.empty:
-        return {}
-    
-    if direction == 'down':
-        high = data['High'].max()
-        low = data['Low'].min()
-        diff = high - low
-        
-        # Calculate retracement levels from the high point
-        levels = {
-            '0%': high,  # Start from the high point
-            '23.6%': high - 0.236 * diff,
-            '38.2%': high - 0.382 * diff,
-            '50%': high - 0.5 * diff,
-            '61.8%': high - 0.618 * diff,
-            '78.6%': high - 0.786 * diff,
-            '100%': low  # End at the low point
-        }
-    else:  # upward retracement
-        latest_low = data['Low'].iloc[-1]  # Latest trading day's low
-        high = data['High'].max()
-        diff = high - latest_low
-        
-        # Calculate retracement levels from the latest low
-        levels = {
-            '0%': latest_low,  # Start from the latest low
-            '23.6%': latest_low + 0.236 * diff,
-            '38.2%': latest_low + 0.382 * diff,
-            '50%': latest_low + 0.5 * diff,
-            '61.8%': latest_low + 0.618 * diff,
-            '78.6%': latest_low + 0.786 * diff,
-            '100%': high  # End at the high point
-        }
-    return levels
-
-# Fetch data for both indices
-spx_data = fetch_data("^GSPC", start_date, end_date)
-ndx_data = fetch_data("^NDX", start_date, end_date)
+            with timings.span("intraday_update", run_timings):
+                for ticker in changed:
+                    draw_intraday(ticker)
+            status.caption(f"Poll {board.ticks}: {len(changed)} updated, bars merged in "
+                           f"{board.last_update * 1000:.2f} ms (fetch {board.last_poll * 1000:.0f} ms)")
+        time.sleep(poll_seconds)
+    status.caption(f"Replay finished after {board.ticks} polls.")
+    st.stop()
+
+# Fetch data for both indices in one batch
+with timings.span("load_data", run_timings):
+    index_data = fetch_batch(TRACKED_TICKERS, start_date, timeframe)
+spx_data = index_data["^GSPC"]
+ndx_data = index_data["^NDX"]
+
+# Show cache, refresher and upstream request health for this server process
+with st.sidebar.expander("Cache Statistics"):
+    st.json({**get_market_cache().stats(), 'refresher': get_refresher().stats(),
+             'provider': get_market_cache().provider.stats()})
 
 # Check if we have data
 if spx_data.empty or ndx_data.empty:
@@ -146,58 +253,28 @@ if spx_data.empty or ndx_data.empty:
     st.stop()
 
 # Calculate Fibonacci levels for both directions
-spx_fib_levels_down = calculate_fibonacci_levels(spx_data, 'down')
-spx_fib_levels_up = calculate_fibonacci_levels(spx_data, 'up')
-ndx_fib_levels_down = calculate_fibonacci_levels(ndx_data, 'down')
-ndx_fib_levels_up = calculate_fibonacci_levels(ndx_data, 'up')
+with timings.span("fibonacci", run_timings):
+    spx_fib_levels_down = calculate_fibonacci_levels(spx_data, 'down', fib_anchor, swing_threshold, fib_ratios)
+    spx_fib_levels_up = calculate_fibonacci_levels(spx_data, 'up', fib_anchor, swing_threshold, fib_ratios)
+    ndx_fib_levels_down = calculate_fibonacci_levels(ndx_data, 'down', fib_anchor, swing_threshold, fib_ratios)
+    ndx_fib_levels_up = calculate_fibonacci_levels(ndx_data, 'up', fib_anchor, swing_threshold, fib_ratios)
 
 # Create two columns for the layout
 col1, col2 = st.columns(2)
 
-# Function to create price chart with Fibonacci levels
-def create_price_chart(data, fib_levels_down, fib_levels_up, title):
-    fig = go.Figure()
-    
-    # Add candlestick chart
-    fig.add_trace(go.Candlestick(
-        x=data.index,
-        open=data['Open'],
-        high=data['High'],
-        low=data['Low'],
-        close=data['Close'],
-        name=title
-    ))
-    
-    # Add downward Fibonacci levels as horizontal lines (red)
-    colors_down = ['rgba(255,0,0,0.5)', 'rgba(255,165,0,0.5)', 'rgba(255,255,0,0.5)', 
-              'rgba(0,255,0,0.5)', 'rgba(0,0,255,0.5)', 'rgba(75,0,130,0.5)']
-    
-    for (level, value), color in zip(fib_levels_down.items(), colors_down):
-        fig.add_hline(y=value, line_dash="dash", line_color=color,
-                     annotation_text=f"Down {level}", annotation_position="right")
-    
-    # Add upward Fibonacci levels as horizontal lines (green)
-    colors_up = ['rgba(0,255,0,0.5)', 'rgba(0,200,0,0.5)', 'rgba(0,150,0,0.5)',
-                'rgba(0,100,0,0.5)', 'rgba(0,50,0,0.5)', 'rgba(0,25,0,0.5)']
-    
-    for (level, value), color in zip(fib_levels_up.items(), colors_up):
-        fig.add_hline(y=value, line_dash="dot", line_color=color,
-                     annotation_text=f"Up {level}", annotation_position="left")
-    
-    fig.update_layout(
-        title=title,
-        yaxis_title='Price',
-        xaxis_title='Date',
-        height=600
-    )
-    
-    return fig
+# Bars to chart: candles at the selected timeframe, or the full daily history decimated server-side
+def chart_data(ticker, resampled_data):
+    if chart_mode == 'webgl':
+        return get_refresher().snapshot(ticker).daily.loc[start_date:]
+    return resampled_data
 
 # Display S&P 500 chart
 with col1:
     st.subheader("S&P 500 (^GSPC)")
-    fig_spx = create_price_chart(spx_data, spx_fib_levels_down, spx_fib_levels_up, 'S&P 500 with Fibonacci Retracement Levels')
-    st.plotly_chart(fig_spx, use_container_width=True)
+    with timings.span("chart_build", run_timings):
+        fig_spx = create_price_chart(chart_data("^GSPC", spx_data), spx_fib_levels_down, spx_fib_levels_up, 'S&P 500 with Fibonacci Retracement Levels', chart_mode, CHART_POINTS)
+    with timings.span("chart_render", run_timings):
+        st.plotly_chart(fig_spx, use_container_width=True)
     
     # Display S&P 500 Fibonacci levels
     st.subheader("S&P 500 Fibonacci Levels")
@@ -214,8 +291,10 @@ with col1:
 # Display NASDAQ 100 chart
 with col2:
     st.subheader("NASDAQ 100 (^NDX)")
-    fig_ndx = create_price_chart(ndx_data, ndx_fib_levels_down, ndx_fib_levels_up, 'NASDAQ 100 with Fibonacci Retracement Levels')
-    st.plotly_chart(fig_ndx, use_container_width=True)
+    with timings.span("chart_build", run_timings):
+        fig_ndx = create_price_chart(chart_data("^NDX", ndx_data), ndx_fib_levels_down, ndx_fib_levels_up, 'NASDAQ 100 with Fibonacci Retracement Levels', chart_mode, CHART_POINTS)
+    with timings.span("chart_render", run_timings):
+        st.plotly_chart(fig_ndx, use_container_width=True)
     
     # Display NASDAQ 100 Fibonacci levels
     st.subheader("NASDAQ 100 Fibonacci Levels")
@@ -255,45 +334,76 @@ st.markdown("Ask questions about the technical analysis, Fibonacci levels, or ma
 user_query = st.text_input("Enter your question about the technical analysis:", 
                          placeholder="e.g., What do the current Fibonacci levels suggest about market direction?")
 
-if user_query and client is not None:
-    # Prepare context for OpenAI
-    context = f"""
-    Current Market Data:
-    - S&P 500 Current Price: ${spx_data['Close'].iloc[-1]:,.2f}
-    - S&P 500 Period Change: {spx_change:.2f}%
-    - NASDAQ 100 Current Price: ${ndx_data['Close'].iloc[-1]:,.2f}
-    - NASDAQ 100 Period Change: {ndx_change:.2f}%
+if user_query and api_key:
+    # Prepare a compact, token-budgeted context for OpenAI
+    with timings.span("ai_context", run_timings):
+        context_builder = ContextBuilder(token_budget=context_budget)
+        context_builder.add("Current Market Data", ['Index', 'Price', 'Change%'], [
+            ['S&P 500', spx_data['Close'].iloc[-1], spx_change],
+            ['NASDAQ 100', ndx_data['Close'].iloc[-1], ndx_change]
+        ], priority=0)
+        context_builder.add_fibonacci("S&P 500 Fibonacci Levels",
+                                      {'Down': spx_fib_levels_down, 'Up': spx_fib_levels_up}, priority=1)
+        context_builder.add_fibonacci("NASDAQ 100 Fibonacci Levels",
+                                      {'Down': ndx_fib_levels_down, 'Up': ndx_fib_levels_up}, priority=1)
+        context, context_report = context_builder.build()
     
-    S&P 500 Fibonacci Levels (Downward):
-    {spx_fib_levels_down}
+    # Track prompt size so we can watch cost and time-to-first-token
+    context_note = f"Prompt context: ~{context_report['tokens']} tokens, {context_report['chars']} characters"
+    if context_report['dropped']:
+        context_note += f" (over budget, left out: {', '.join(context_report['dropped'])})"
+    st.caption(context_note)
     
-    S&P 500 Fibonacci Levels (Upward):
-    {spx_fib_levels_up}
+    # Identical questions over an unchanged market snapshot and prompt context
+    # reuse the cached answer
+    response_cache = get_response_cache()
+    response_key = cache_key(user_query, market_fingerprint(
+        spx_data['Close'].iloc[-1], spx_change, ndx_data['Close'].iloc[-1], ndx_change,
+        spx_fib_levels_down, spx_fib_levels_up, ndx_fib_levels_down, ndx_fib_levels_up
+    ), context)
+    cached_answer = response_cache.get(response_key)
     
-    NASDAQ 100 Fibonacci Levels (Downward):
-    {ndx_fib_levels_down}
-    
-    NASDAQ 100 Fibonacci Levels (Upward):
-    {ndx_fib_levels_up}
-    """
-    
-    try:
-        # Call OpenAI API using the new API format
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": "You are a professional technical analyst specializing in Fibonacci analysis and market trends. Provide clear, concise, and insightful analysis based on the provided data."},
-                {"role": "user", "content": f"Context: {context}\n\nQuestion: {user_query}"}
-            ],
-            temperature=0.7,
-            max_tokens=500
-        )
-        
-        # Display the response
+    if cached_answer is not None:
         st.markdown("### Analysis")
-        st.write(response.choices[0].message.content)
+        st.write(cached_answer)
+    else:
+        # Cancel a still-streaming answer to an earlier question
+        previous_cancel = st.session_state.get("ai_cancel")
+        if previous_cancel is not None:
+            previous_cancel.set()
+        cancel_event = threading.Event()
+        st.session_state["ai_cancel"] = cancel_event
         
-    except Exception as e:
-        st.error(f"Error getting AI analysis: {str(e)}")
-elif user_query and client is None:
-    st.warning("Please enter your OpenAI API key in the sidebar to get AI analysis.") 
\ No newline at end of file
+        try:
+            # Stream the answer from the OpenAI API as tokens arrive
+            client = get_openai_client(api_key)
+            st.markdown("### Analysis")
+            with timings.span("ai_response", run_timings):
+                answer = st.write_stream(stream_openai_client(client, build_messages(context, user_query),
+                                                              timeout=ai_timeout, cancel_event=cancel_event))
+            if not cancel_event.is_set():
+                response_cache.put(response_key, answer)
+            
+        except Exception as e:
+            st.error(f"Error getting AI analysis: {str(e)}")
+elif user_query and not api_key:
+    st.warning("Please enter your OpenAI API key in the sidebar to get AI analysis.") 
+
+# Show AI answer cache effectiveness for this server process
+with st.sidebar.expander("AI Response Cache"):
+    st.json(get_response_cache().stats())
+
+# Per-stage timings: this run, and percentiles over every run of this server process
+with st.sidebar.expander("Timings"):
+    if timings.enabled:
+        timing_rows = [
+            {'Stage': stage, 'This run (ms)': run_timings.get(stage, 0.0) * 1000,
+             'Calls': summary['count'], 'p50 (ms)': summary['p50'] * 1000,
+             'p95 (ms)': summary['p95'] * 1000, 'Max (ms)': summary['max'] * 1000}
+            for stage, summary in timings.summary().items()
+        ]
+        st.dataframe(pd.DataFrame(timing_rows).round(1), hide_index=True)
+        st.download_button("Export JSON", timings.to_json(), "timings.json", "application/json")
+        st.download_button("Export Prometheus", timings.to_prometheus(), "timings.prom", "text/plain")
+    else:
+        st.write("Timing is disabled (FIB_TIMINGS=0).")
@@ -0,0 +1,173 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from fib import FIB_LABELS, rolling_fibonacci_levels
+from scan import DEFAULT_TICKERS_FILE, load_bars, read_tickers, write_results
+
+# Lookback windows in trading days: one quarter, half a year, one year
+DEFAULT_WINDOWS = (63, 126, 252)
+
+# Per-level counters summed over bars and tickers
+STAT_FIELDS = ['bars', 'touches', 'breaks', 'bounces', 'return_sum', 'directional_sum']
+
+
+# Touch/break/bounce counts for every lookback window and retracement
+# ratio, each of shape (len(windows), len(FIB_LABELS)).
+#
+# Levels for bar t come from the bars before it, so nothing looks ahead.
+# The close before t says which side the level is on: above it the level
+# is support, below it resistance.
+#   touch:  bar t's high-low range reaches the level
+#   break:  a touch that closes on the other side of the level
+#   bounce: a touch that didn't break and is still on the starting side
+#           `horizon` bars later
+# Forward returns are close[t + horizon] / close[t] - 1; the directional
+# return is signed so that moving away from the level counts as positive.
+def level_statistics(ohlc, windows=DEFAULT_WINDOWS, direction='down', horizon=5):
+    ohlc = np.asarray(ohlc, dtype='float64')
+    shape = (len(windows), len(FIB_LABELS))
+    n = len(ohlc)
+    if n <= horizon + 1:
+        return {field: np.zeros(shape) for field in STAT_FIELDS}
+
+    high, low, close = ohlc[:, 1], ohlc[:, 2], ohlc[:, 3]
+    levels = rolling_fibonacci_levels(ohlc, windows, direction)
+
+    bars = np.arange(1, n - horizon)
+    level = levels[:, bars - 1, :]                                  # (W, m, R)
+    side = np.sign(close[bars - 1, None] - level)
+    valid = ~np.isnan(level) & (side != 0)
+    touch = valid & (low[bars, None] <= level) & (level <= high[bars, None])
+    broke = touch & (side * (close[bars, None] - level) < 0)
+    later = close[bars + horizon, None]
+    bounce = touch & ~broke & (side * (later - level) > 0)
+    forward = (later / close[bars, None] - 1) * np.ones_like(level)
+
+    return {
+        'bars': valid.sum(axis=1),
+        'touches': touch.sum(axis=1),
+        'breaks': broke.sum(axis=1),
+        'bounces': bounce.sum(axis=1),
+        'return_sum': np.where(touch, forward, 0).sum(axis=1),
+        'directional_sum': np.where(touch, side * forward, 0).sum(axis=1),
+    }
+
+
+# Long-form table of hit rates and mean forward returns per level
+def summarize(stats, windows, direction, horizon):
+    rows = []
+    for w, window in enumerate(windows):
+        for r, label in enumerate(FIB_LABELS):
+            counts = {field: stats[field][w, r] for field in STAT_FIELDS}
+            touches = counts['touches']
+            rows.append({
+                'Direction': direction,
+                'Window': int(window),
+                'Level': label,
+                'Bars': int(counts['bars']),
+                'Touches': int(touches),
+                'Touch Rate': touches / counts['bars'] if counts['bars'] else np.nan,
+                'Break Rate': counts['breaks'] / touches if touches else np.nan,
+                'Bounce Rate': counts['bounces'] / touches if touches else np.nan,
+                f'Mean Return {horizon}d': counts['return_sum'] / touches if touches else np.nan,
+                f'Mean Directional Return {horizon}d': counts['directional_sum'] / touches if touches else np.nan,
+            })
+    return pd.DataFrame(rows)
+
+
+# Pack every ticker's OHLC bars into one (n, 4) float64 .npy file that the
+# worker processes memory-map; returns {ticker: (start row, stop row)}
+def pack_prices(tickers, source, path, out_path, start=None):
+    frames = {ticker: load_bars(source, path, ticker, start) for ticker in tickers}
+    frames = {ticker: frame for ticker, frame in frames.items() if not frame.empty}
+    prices = np.lib.format.open_memmap(out_path, mode='w+', dtype='float64',
+                                       shape=(sum(map(len, frames.values())), 4))
+    slices, offset = {}, 0
+    for ticker, frame in frames.items():
+        prices[offset:offset + len(frame)] = frame[['Open', 'High', 'Low', 'Close']].to_numpy(dtype='float64')
+        slices[ticker] = (offset, offset + len(frame))
+        offset += len(frame)
+    prices.flush()
+    del prices
+    return slices
+
+
+_prices = None
+
+
+# Each worker maps the packed prices once; the pages are shared through
+# the OS page cache instead of being pickled to every process
+def _open_prices(prices_path):
+    global _prices
+    _prices = np.load(prices_path, mmap_mode='r')
+
+
+def _ticker_statistics(rows, windows, directions, horizon):
+    ohlc = _prices[rows[0]:rows[1]]
+    return {direction: level_statistics(ohlc, windows, direction, horizon) for direction in directions}
+
+
+# Sweep every ticker and aggregate the statistics per level
+def backtest(tickers, source, path, start=None, windows=DEFAULT_WINDOWS, directions=('down', 'up'),
+             horizon=5, workers=None):
+    windows = tuple(int(window) for window in windows)
+    with tempfile.TemporaryDirectory() as tmp:
+        prices_path = os.path.join(tmp, "prices.npy")
+        slices = pack_prices(tickers, source, path, prices_path, start)
+        jobs = list(slices.values())
+        n = len(jobs)
+        args = (jobs, [windows] * n, [directions] * n, [horizon] * n)
+        if workers == 1:
+            _open_prices(prices_path)
+            results = list(map(_ticker_statistics, *args))
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_open_prices,
+                                     initargs=(prices_path,)) as pool:
+                chunksize = max(1, n // ((workers or os.cpu_count() or 1) * 4))
+                results = list(pool.map(_ticker_statistics, *args, chunksize=chunksize))
+
+    tables = []
+    for direction in directions:
+        totals = {field: sum(result[direction][field] for result in results)
+                  if results else np.zeros((len(windows), len(FIB_LABELS)))
+                  for field in STAT_FIELDS}
+        tables.append(summarize(totals, windows, direction, horizon))
+    return pd.concat(tables, ignore_index=True), len(slices)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Backtest how price behaves at Fibonacci retracement levels.")
+    parser.add_argument("tickers", nargs="*", help="Tickers to backtest (default: --tickers-file)")
+    parser.add_argument("--tickers-file", default=DEFAULT_TICKERS_FILE, help="File with one ticker per line")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--store", default=os.environ.get("FIB_DATA_DIR", "data"), help="Local bar store directory")
+    source.add_argument("--fixtures", help="Directory of <ticker>.csv daily bar files")
+    parser.add_argument("--start", help="First date to include (YYYY-MM-DD)")
+    parser.add_argument("--windows", default=",".join(map(str, DEFAULT_WINDOWS)),
+                        help="Comma-separated lookback windows in bars")
+    parser.add_argument("--direction", choices=["down", "up", "both"], default="both")
+    parser.add_argument("--horizon", type=int, default=5, help="Bars ahead for bounces and forward returns")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("--output", default="backtest_results.csv", help="CSV or .parquet path, or - for stdout")
+    args = parser.parse_args(argv)
+
+    tickers = args.tickers or read_tickers(args.tickers_file)
+    source, path = ('fixtures', args.fixtures) if args.fixtures else ('store', args.store)
+    windows = [int(window) for window in args.windows.split(",")]
+    directions = ('down', 'up') if args.direction == 'both' else (args.direction,)
+
+    start_time = time.perf_counter()
+    results, found = backtest(tickers, source, path, args.start, windows, directions, args.horizon, args.workers)
+    elapsed = time.perf_counter() - start_time
+    write_results(results, args.output)
+
+    print(f"Backtested {found} of {len(tickers)} tickers in {elapsed:.2f} seconds", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
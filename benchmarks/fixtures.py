@@ -0,0 +1,74 @@
+import os
+import numpy as np
+import pandas as pd
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# History lengths to benchmark, in daily bars: from one day up to roughly
+# what period="max" returns for ^GSPC (daily bars since 1927)
+SIZES = {
+    '1d': 1,
+    '1mo': 21,
+    '1y': 252,
+    '10y': 2520,
+    'max': 24500,
+}
+
+TICKERS = ('^GSPC', '^NDX')
+_BASE_PRICES = {'^GSPC': 1400.0, '^NDX': 2000.0}
+
+
+def fixture_path(ticker):
+    return os.path.join(FIXTURE_DIR, f"{ticker}.csv")
+
+
+# Deterministic random-walk daily bars ending on a fixed date, so every run
+# and every commit benchmarks the same input
+def synthetic_bars(ticker, periods, end='2024-12-31', seed=0):
+    index = pd.bdate_range(end=end, periods=periods)
+    rng = np.random.default_rng([seed, sum(map(ord, ticker))])
+    close = _BASE_PRICES.get(ticker, 100.0) * np.exp(np.cumsum(rng.normal(0.0003, 0.01, periods)))
+    spread = np.abs(rng.normal(0, 0.005, periods)) * close
+    open_ = close * (1 + rng.normal(0, 0.003, periods))
+    return pd.DataFrame({
+        'Open': open_,
+        'High': np.maximum(open_, close) + spread,
+        'Low': np.minimum(open_, close) - spread,
+        'Close': close,
+        'Volume': rng.integers(10**8, 10**9, periods).astype('float64'),
+    }, index=index)
+
+
+# The last `periods` bars of a recorded history when one has been saved
+# with `python -m benchmarks.run --record`, otherwise synthetic bars
+def load_bars(ticker, periods):
+    path = fixture_path(ticker)
+    if os.path.exists(path):
+        recorded = pd.read_csv(path, index_col=0, parse_dates=True)
+        if len(recorded) >= periods:
+            return recorded.iloc[-periods:]
+    return synthetic_bars(ticker, periods)
+
+
+# The same bars laid out like a grouped yf.download() result: a
+# (Price, Ticker) column MultiIndex, with an Adj Close column
+def yahoo_download(frames):
+    columns = {}
+    for ticker, frame in frames.items():
+        frame = frame.assign(**{'Adj Close': frame['Close']})
+        for column in ['Adj Close', 'Close', 'High', 'Low', 'Open', 'Volume']:
+            columns[(column, ticker)] = frame[column]
+    data = pd.DataFrame(columns)
+    data.columns = pd.MultiIndex.from_tuples(data.columns, names=['Price', 'Ticker'])
+    return data.sort_index(axis=1, level=0, sort_remaining=False)
+
+
+# Save full histories from Yahoo as fixtures (needs network access)
+def record(tickers=TICKERS, provider=None):
+    from providers import YFinanceProvider
+    provider = provider or YFinanceProvider(timeout=60)
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    frames = provider.fetch_many(tickers, '1900-01-01', pd.Timestamp.now().normalize())
+    for ticker, frame in frames.items():
+        frame.to_csv(fixture_path(ticker))
+    return frames
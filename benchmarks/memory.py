@@ -0,0 +1,132 @@
+import argparse
+import gc
+import json
+import os
+import subprocess
+import sys
+import tracemalloc
+import numpy as np
+import pandas as pd
+from benchmarks.fixtures import SIZES, synthetic_bars, yahoo_download
+from benchmarks.run import RESULTS_DIR, git_commit
+from providers import OHLCV_COLUMNS, split_ohlcv
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# The original fetch_data ingestion: an empty frame filled one
+# (column, ticker) column at a time, for reference
+def legacy_split(data, tickers):
+    frames = {}
+    for ticker in tickers:
+        processed_data = pd.DataFrame()
+        for col in OHLCV_COLUMNS:
+            processed_data[col] = data[(col, ticker)]
+        frames[ticker] = processed_data.dropna(how='all')
+    return frames
+
+
+# Selecting every OHLCV column of the batch, then one cross-section per
+# ticker and a cleaned copy of it: three copies of each ticker's data
+def xs_split(data, tickers):
+    ohlcv = data.loc[:, OHLCV_COLUMNS]
+    return {ticker: ohlcv.xs(ticker, axis=1, level=1)[OHLCV_COLUMNS].dropna(how='all') for ticker in tickers}
+
+
+IMPLEMENTATIONS = {
+    'legacy': legacy_split,
+    'xs': xs_split,
+    'current': split_ohlcv,
+}
+
+
+def _status_kb(field):
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+# Reset the kernel's peak RSS counter (Linux only) so the peak measured
+# afterwards belongs to the ingestion, not to building the input
+def _reset_peak_rss():
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+# Ingest a synthetic `period="max"` download of `n_tickers` tickers and
+# report the extra memory it needed. Runs in a fresh process per case.
+def measure(implementation, n_tickers, bars=SIZES['max']):
+    base = synthetic_bars('^GSPC', bars)
+    download = yahoo_download({f"T{i:03d}": base * (1 + i / 100) for i in range(n_tickers)})
+    tickers = list(download.columns.get_level_values(1).unique())
+    del base
+    gc.collect()
+
+    rss_reset = _reset_peak_rss()
+    rss_before = _status_kb("VmRSS")
+    tracemalloc.start()
+    frames = IMPLEMENTATIONS[implementation](download, tickers)
+    _, peak_alloc = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    peak_rss = _status_kb("VmHWM") if rss_reset else None
+
+    return {
+        'implementation': implementation,
+        'tickers': n_tickers,
+        'bars': bars,
+        'input_mb': download.memory_usage(deep=True).sum() / 2**20,
+        'output_mb': sum(frame.memory_usage().sum() for frame in frames.values()) / 2**20,
+        'peak_alloc_mb': peak_alloc / 2**20,
+        'peak_rss_delta_mb': (peak_rss - rss_before) / 1024 if peak_rss is not None else None,
+    }
+
+
+def run(universes=(10, 100), implementations=tuple(IMPLEMENTATIONS), log=None):
+    results = []
+    for n_tickers in universes:
+        for implementation in implementations:
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.memory", "--child", implementation, str(n_tickers)],
+                capture_output=True, text=True, check=True, cwd=REPO_ROOT,
+            ).stdout
+            result = json.loads(output)
+            results.append(result)
+            if log:
+                rss = result['peak_rss_delta_mb']
+                print(f"{implementation:<8} {n_tickers:>4} tickers  input {result['input_mb']:8.1f} MB  "
+                      f"peak alloc {result['peak_alloc_mb']:8.1f} MB  "
+                      f"peak RSS +{'n/a' if rss is None else f'{rss:.1f}'} MB", file=log)
+    return {'commit': git_commit(), 'numpy': np.__version__, 'pandas': pd.__version__, 'results': results}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Peak memory of ingesting large multi-ticker downloads")
+    parser.add_argument("--tickers", type=int, action="append", help="Universe size (repeatable; default 10 and 100)")
+    parser.add_argument("--output", help="Results JSON (default: benchmarks/results/memory-<commit>.json)")
+    parser.add_argument("--child", nargs=2, metavar=("IMPLEMENTATION", "TICKERS"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(measure(args.child[0], int(args.child[1]))))
+        return 0
+
+    results = run(args.tickers or (10, 100), log=sys.stderr)
+    output = args.output or os.path.join(RESULTS_DIR, f"memory-{results['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"Wrote {output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,202 @@
+import argparse
+import atexit
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import timeit
+from datetime import datetime, timezone
+import numpy as np
+import pandas as pd
+from benchmarks.fixtures import SIZES, TICKERS, load_bars, record, yahoo_download
+from charts import create_price_chart
+from fib import calculate_fibonacci_levels
+from indicators import calculate_rsi
+from providers import split_ohlcv
+from refresher import Snapshot
+from resample import OHLCVPyramid, resample_ohlcv
+from shared_snapshots import SharedSnapshots, SnapshotPublisher
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+# name -> setup(frames) returning the function to time. `frames` maps each
+# ticker to its bars at the size being measured.
+CASES = {}
+
+
+def case(name):
+    def register(setup):
+        CASES[name] = setup
+        return setup
+    return register
+
+
+@case('fetch_processing')
+def _fetch_processing(frames):
+    download = yahoo_download(frames)
+    return lambda: split_ohlcv(download, list(frames))
+
+
+@case('resample_2ME')
+def _resample(frames):
+    data = frames['^GSPC']
+    return lambda: resample_ohlcv(data, '2ME')
+
+
+@case('pyramid_build')
+def _pyramid(frames):
+    data = frames['^GSPC']
+    return lambda: OHLCVPyramid(data)
+
+
+@case('fibonacci_range')
+def _fibonacci_range(frames):
+    data = frames['^GSPC']
+    return lambda: (calculate_fibonacci_levels(data, 'down'), calculate_fibonacci_levels(data, 'up'))
+
+
+@case('fibonacci_swing')
+def _fibonacci_swing(frames):
+    data = frames['^GSPC']
+    return lambda: calculate_fibonacci_levels(data, 'down', anchor='swing')
+
+
+@case('rsi_sma')
+def _rsi_sma(frames):
+    close = frames['^GSPC']['Close']
+    return lambda: calculate_rsi(close)
+
+
+@case('rsi_wilder')
+def _rsi_wilder(frames):
+    close = frames['^GSPC']['Close']
+    return lambda: calculate_rsi(close, smoothing='wilder')
+
+
+@case('chart_candlestick')
+def _chart_candlestick(frames):
+    data = frames['^GSPC']
+    down, up = calculate_fibonacci_levels(data, 'down'), calculate_fibonacci_levels(data, 'up')
+    return lambda: create_price_chart(data, down, up, "S&P 500")
+
+
+@case('chart_webgl')
+def _chart_webgl(frames):
+    data = frames['^GSPC']
+    down, up = calculate_fibonacci_levels(data, 'down'), calculate_fibonacci_levels(data, 'up')
+    return lambda: create_price_chart(data, down, up, "S&P 500", mode='webgl', max_points=1000)
+
+
+# A shared snapshot directory holding every fixture ticker, removed at exit
+def _shared_dir(frames):
+    root = tempfile.mkdtemp(prefix="fib-shared-")
+    atexit.register(shutil.rmtree, root, True)
+    SnapshotPublisher(root).publish({ticker: Snapshot(ticker, 1, 0.0, data, OHLCVPyramid(data))
+                                     for ticker, data in frames.items()})
+    return root
+
+
+# A new worker process mapping the published snapshots
+@case('shared_attach')
+def _shared_attach(frames):
+    root = _shared_dir(frames)
+    return lambda: SharedSnapshots(root).snapshots(list(frames))
+
+
+# A session reading snapshots that are already mapped: the cache-hit path
+@case('shared_read')
+def _shared_read(frames):
+    reader = SharedSnapshots(_shared_dir(frames))
+    return lambda: reader.snapshots(list(frames))
+
+
+# Best and median seconds per call. Like `python -m timeit`, the loop count
+# is picked so one repeat takes at least `min_time` seconds.
+def measure(func, repeat=5, min_time=0.05):
+    timer = timeit.Timer(func)
+    number = 1
+    while timer.timeit(number) < min_time and number < 10**6:
+        number *= 10
+    times = np.array(timer.repeat(repeat, number)) / number
+    return {'number': number, 'repeat': repeat, 'min': float(times.min()), 'median': float(np.median(times))}
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True, cwd=os.path.dirname(RESULTS_DIR)).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run(cases=None, sizes=None, repeat=5, min_time=0.05, log=None):
+    results = []
+    for size in sizes or list(SIZES):
+        frames = {ticker: load_bars(ticker, SIZES[size]) for ticker in TICKERS}
+        for name in cases or list(CASES):
+            timing = measure(CASES[name](frames), repeat, min_time)
+            results.append({'case': name, 'size': size, 'bars': SIZES[size], **timing})
+            if log:
+                print(f"{name:<20} {size:>4} {timing['min'] * 1e3:10.3f} ms", file=log)
+    return {
+        'commit': git_commit(),
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'versions': {'numpy': np.__version__, 'pandas': pd.__version__},
+        'results': results,
+    }
+
+
+# Cases whose best time grew by more than `threshold` (1.25 = 25% slower)
+def compare(baseline, current, threshold=1.25):
+    before = {(r['case'], r['size']): r['min'] for r in baseline['results']}
+    regressions = []
+    for result in current['results']:
+        key = (result['case'], result['size'])
+        if key in before and before[key] > 0:
+            ratio = result['min'] / before[key]
+            if ratio > threshold:
+                regressions.append((key[0], key[1], before[key], result['min'], ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline benchmarks over fixture price histories")
+    parser.add_argument("--case", action="append", choices=sorted(CASES), help="Case to run (repeatable; default all)")
+    parser.add_argument("--size", action="append", choices=list(SIZES), help="History size (repeatable; default all)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.05, help="Minimum seconds per repeat")
+    parser.add_argument("--output", help="Results JSON (default: benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", help="Baseline results JSON; exit 1 on regressions")
+    parser.add_argument("--threshold", type=float, default=1.25, help="Slowdown ratio counted as a regression")
+    parser.add_argument("--record", action="store_true", help="Download ^GSPC/^NDX histories as fixtures and exit")
+    args = parser.parse_args(argv)
+
+    if args.record:
+        for ticker, frame in record().items():
+            print(f"Recorded {len(frame)} bars for {ticker}", file=sys.stderr)
+        return 0
+
+    results = run(args.case, args.size, args.repeat, args.min_time, log=sys.stderr)
+    output = args.output or os.path.join(RESULTS_DIR, f"{results['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"Wrote {output}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(json.load(f), results, args.threshold)
+        for name, size, before, after, ratio in regressions:
+            print(f"REGRESSION {name} {size}: {before * 1e3:.3f} ms -> {after * 1e3:.3f} ms ({ratio:.2f}x)",
+                  file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
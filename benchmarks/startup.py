@@ -0,0 +1,129 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from benchmarks.fixtures import SIZES, TICKERS, load_bars
+from benchmarks.run import RESULTS_DIR, git_commit
+from refresher import Snapshot
+from resample import OHLCVPyramid
+from shared_snapshots import LOCK, SnapshotPublisher, fcntl
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+APPS = ('app.py', 'app_simple.py')
+
+# Heavy modules, for reference; the dashboard should only load the first
+# two before its first paint
+MODULES = ('streamlit', 'pandas', 'plotly.graph_objects', 'yfinance', 'openai')
+
+# Modules a page load that asks no question and fetches nothing must not import
+DEFERRED = ('yfinance', 'openai')
+
+
+# Seconds to import `module` in a fresh interpreter
+def import_time(module):
+    code = f"import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                            cwd=REPO_ROOT).stdout
+    return float(output)
+
+
+# Run one app once in this (fresh) process. First paint is the time from
+# process start until the page title is sent.
+def run_app(app):
+    started = time.perf_counter()
+    import streamlit as st
+    from streamlit.testing.v1 import AppTest
+
+    painted = []
+    title = st.title
+
+    def timed_title(*args, **kwargs):
+        painted.append(time.perf_counter())
+        return title(*args, **kwargs)
+
+    st.title = timed_title
+    at = AppTest.from_file(os.path.join(REPO_ROOT, app), default_timeout=120).run()
+    finished = time.perf_counter()
+    return {
+        'app': app,
+        'first_paint': painted[0] - started if painted else None,
+        'full_run': finished - started,
+        'errors': [element.value for element in at.exception] + [element.value for element in at.error],
+        'loaded': sorted(module for module in DEFERRED if module in sys.modules),
+    }
+
+
+# Publish fixture snapshots into `root` and hold the publisher lock, so the
+# apps only read them and never fetch. Returns the open lock file.
+def publish_fixtures(root, bars=SIZES['max']):
+    snapshots = {}
+    for ticker in TICKERS:
+        daily = load_bars(ticker, bars)
+        snapshots[ticker] = Snapshot(ticker, 1, time.time(), daily, OHLCVPyramid(daily))
+    SnapshotPublisher(root).publish(snapshots)
+    lock_file = open(os.path.join(root, LOCK), 'a')
+    if fcntl is not None:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    return lock_file
+
+
+def measure_app(app, shared_dir, data_dir):
+    env = dict(os.environ, FIB_SHARED_DIR=shared_dir, FIB_DATA_DIR=data_dir, FIB_TIMINGS="0")
+    output = subprocess.run([sys.executable, "-m", "benchmarks.startup", "--child", app],
+                            capture_output=True, text=True, check=True, cwd=REPO_ROOT, env=env).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+# Best of `repeat` cold starts per app
+def run(apps=APPS, repeat=3, modules=MODULES, log=None):
+    results = {'commit': git_commit(), 'imports': {}, 'apps': []}
+    for module in modules:
+        results['imports'][module] = min(import_time(module) for _ in range(repeat))
+        if log:
+            print(f"import {module:<22} {results['imports'][module] * 1000:8.1f} ms", file=log)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        lock_file = publish_fixtures(os.path.join(tmp, "shared"))
+        try:
+            for app in apps:
+                runs = [measure_app(app, os.path.join(tmp, "shared"), os.path.join(tmp, "data"))
+                        for _ in range(repeat)]
+                best = min(runs, key=lambda result: result['full_run'])
+                best['first_paint'] = min(result['first_paint'] for result in runs)
+                results['apps'].append(best)
+                if log:
+                    print(f"{app:<15} first paint {best['first_paint'] * 1000:8.1f} ms  "
+                          f"full run {best['full_run'] * 1000:8.1f} ms  loaded {best['loaded'] or 'none'}",
+                          file=log)
+        finally:
+            lock_file.close()
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import time and first paint of the dashboard apps")
+    parser.add_argument("--app", action="append", choices=APPS, help="App to run (repeatable; default both)")
+    parser.add_argument("--repeat", type=int, default=3, help="Cold starts per app; the best is kept")
+    parser.add_argument("--output", help="Results JSON (default: benchmarks/results/startup-<commit>.json)")
+    parser.add_argument("--child", metavar="APP", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(run_app(args.child)))
+        return 0
+
+    results = run(args.app or APPS, args.repeat, log=sys.stderr)
+    output = args.output or os.path.join(RESULTS_DIR, f"startup-{results['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"Wrote {output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+import numpy as np
+import pandas as pd
+
+# Line colors for the downward (red) and upward (green) Fibonacci levels
+COLORS_DOWN = ['rgba(255,0,0,0.5)', 'rgba(255,165,0,0.5)', 'rgba(255,255,0,0.5)',
+               'rgba(0,255,0,0.5)', 'rgba(0,0,255,0.5)', 'rgba(75,0,130,0.5)']
+COLORS_UP = ['rgba(0,255,0,0.5)', 'rgba(0,200,0,0.5)', 'rgba(0,150,0,0.5)',
+             'rgba(0,100,0,0.5)', 'rgba(0,50,0,0.5)', 'rgba(0,25,0,0.5)']
+# Colors for the 100% line and the extensions beyond it, cycled
+COLORS_EXTENSION = ['rgba(128,128,128,0.5)', 'rgba(255,0,255,0.5)', 'rgba(0,255,255,0.5)',
+                    'rgba(255,105,180,0.5)']
+
+
+# One color per level. The plain retracement set leaves its 100% line out,
+# as the chart always has; longer sets with extensions draw every level.
+def level_colors(colors, n_levels):
+    extra = n_levels - len(colors) if n_levels > len(colors) + 1 else 0
+    return colors + [COLORS_EXTENSION[i % len(COLORS_EXTENSION)] for i in range(extra)]
+
+
+# Start offsets of `buckets` equal-count buckets over n points
+def bucket_starts(n, buckets):
+    return np.unique(np.linspace(0, n, buckets, endpoint=False).astype(np.int64))
+
+
+# Aggregate bars into at most `max_points` OHLC buckets; each bucket keeps
+# its true high and low, so extremes survive decimation
+def decimate_ohlc(data, max_points):
+    if max_points is None or len(data) <= max_points:
+        return data
+    starts = bucket_starts(len(data), max_points)
+    ends = np.append(starts[1:], len(data)) - 1
+    return pd.DataFrame({
+        'Open': np.asarray(data['Open'])[starts],
+        'High': np.maximum.reduceat(np.asarray(data['High']), starts),
+        'Low': np.minimum.reduceat(np.asarray(data['Low']), starts),
+        'Close': np.asarray(data['Close'])[ends],
+    }, index=data.index[starts])
+
+
+# Min-max decimation of a line: for each bucket keep the positions of its
+# lowest and highest points, in time order
+def minmax_indices(values, max_points):
+    values = np.asarray(values, dtype='float64')
+    n = len(values)
+    if max_points is None or n <= max_points:
+        return np.arange(n)
+    starts = bucket_starts(n, max(1, max_points // 2))
+    lengths = np.diff(np.append(starts, n))
+    bucket = np.repeat(np.arange(len(starts)), lengths)
+    order = np.lexsort((values, bucket))
+    last = np.cumsum(lengths) - 1
+    lows, highs = order[last - lengths + 1], order[last]
+    return np.unique(np.concatenate([lows, highs]))
+
+
+# All Fibonacci lines and labels as plain layout dicts, added in one update
+def fibonacci_shapes(fib_levels_down, fib_levels_up):
+    shapes, annotations = [], []
+    groups = [
+        (fib_levels_down, COLORS_DOWN, 'dash', 'Down', 1, 'right'),
+        (fib_levels_up, COLORS_UP, 'dot', 'Up', 0, 'left'),
+    ]
+    for levels, colors, dash, name, x, anchor in groups:
+        for (level, value), color in zip(levels.items(), level_colors(colors, len(levels))):
+            shapes.append(dict(type='line', xref='paper', x0=0, x1=1, yref='y', y0=value, y1=value,
+                               line=dict(color=color, dash=dash)))
+            annotations.append(dict(xref='paper', x=x, xanchor=anchor, yref='y', y=value,
+                                    yanchor='bottom', text=f"{name} {level}", showarrow=False))
+    return shapes, annotations
+
+
+# Function to create price chart with Fibonacci levels from a DataFrame
+# or CompactBars
+#   mode='candlestick': one candle per bar at the selected timeframe, never
+#                       decimated, so a daily chart shows daily candles
+#   mode='webgl':       full-resolution bars decimated to `max_points`,
+#                       drawn with WebGL traces
+def create_price_chart(data, fib_levels_down, fib_levels_up, title, mode='candlestick', max_points=None):
+    import plotly.graph_objects as go  # loaded at chart time, not at app start
+    fig = go.Figure()
+
+    if mode == 'webgl':
+        # Min-max decimated High/Low band around a Close line, all as WebGL traces
+        keep = minmax_indices(data['Close'], max_points)
+        candles = decimate_ohlc(data, max_points // 2 if max_points else None)
+        fig.add_trace(go.Scattergl(x=candles.index, y=candles['High'], mode='lines',
+                                   line=dict(width=0), showlegend=False, hoverinfo='skip'))
+        fig.add_trace(go.Scattergl(x=candles.index, y=candles['Low'], mode='lines', fill='tonexty',
+                                   line=dict(width=0), fillcolor='rgba(100,100,100,0.2)',
+                                   name='High/Low'))
+        fig.add_trace(go.Scattergl(x=data.index[keep], y=np.asarray(data['Close'])[keep],
+                                   mode='lines', name=title))
+    else:
+        # Add candlestick chart
+        fig.add_trace(go.Candlestick(
+            x=data.index,
+            open=data['Open'],
+            high=data['High'],
+            low=data['Low'],
+            close=data['Close'],
+            name=title
+        ))
+
+    shapes, annotations = fibonacci_shapes(fib_levels_down, fib_levels_up)
+    fig.update_layout(
+        title=title,
+        yaxis_title='Price',
+        xaxis_title='Date',
+        height=600,
+        shapes=shapes,
+        annotations=annotations
+    )
+
+    return fig
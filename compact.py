@@ -0,0 +1,112 @@
+import numpy as np
+import pandas as pd
+from providers import OHLCV_COLUMNS, empty_ohlcv
+
+# One bar in 28 bytes: its position in the shared trading-day calendar,
+# float32 prices and an int64 volume (a float64 frame row plus its
+# DatetimeIndex entry takes 48)
+COMPACT_DTYPE = np.dtype([
+    ('day', '<i4'),
+    ('Open', '<f4'),
+    ('High', '<f4'),
+    ('Low', '<f4'),
+    ('Close', '<f4'),
+    ('Volume', '<i8'),
+])
+
+
+# Days since 1970-01-01 for each date
+def day_numbers(index):
+    return pd.DatetimeIndex(index).values.astype('datetime64[D]').astype(np.int32)
+
+
+# Daily bars for many tickers packed into one structured array, with one
+# calendar of trading days shared by all of them. Each ticker's bars are a
+# contiguous run of the array; tickers are read through CompactBars
+# handles, which are views and copy nothing.
+class CompactUniverse:
+    def __init__(self, frames):
+        frames = dict(frames)
+        days = {ticker: day_numbers(frame.index) for ticker, frame in frames.items()}
+        self.calendar = np.unique(np.concatenate(list(days.values()) or [np.empty(0, np.int32)]))
+        self.bars = np.empty(sum(len(frame) for frame in frames.values()), dtype=COMPACT_DTYPE)
+        self._slices = {}
+
+        offset = 0
+        for ticker, frame in frames.items():
+            rows = self.bars[offset:offset + len(frame)]
+            rows['day'] = np.searchsorted(self.calendar, days[ticker])
+            for column in OHLCV_COLUMNS[:4]:
+                rows[column] = frame[column].to_numpy()
+            rows['Volume'] = np.nan_to_num(frame['Volume'].to_numpy(dtype='float64'))
+            self._slices[ticker] = (offset, offset + len(frame))
+            offset += len(frame)
+
+    # Load tickers from an OHLCVStore without keeping their frames around
+    @classmethod
+    def from_store(cls, store, tickers, start=None):
+        return cls({ticker: store.load(ticker, start=start) for ticker in tickers})
+
+    @property
+    def tickers(self):
+        return list(self._slices)
+
+    @property
+    def nbytes(self):
+        return self.bars.nbytes + self.calendar.nbytes
+
+    def __len__(self):
+        return len(self._slices)
+
+    def __contains__(self, ticker):
+        return ticker in self._slices
+
+    def __getitem__(self, ticker):
+        start, stop = self._slices[ticker]
+        return CompactBars(self, ticker, self.bars[start:stop])
+
+
+# One ticker's bars inside a CompactUniverse. Columns come back as float32
+# (int64 for Volume) views of the packed array, so the Fibonacci, RSI and
+# chart code can read them like DataFrame columns.
+class CompactBars:
+    __slots__ = ('universe', 'ticker', 'bars')
+
+    def __init__(self, universe, ticker, bars):
+        self.universe = universe
+        self.ticker = ticker
+        self.bars = bars
+
+    def __len__(self):
+        return len(self.bars)
+
+    @property
+    def empty(self):
+        return len(self.bars) == 0
+
+    def __getitem__(self, column):
+        return self.bars[column]
+
+    @property
+    def dates(self):
+        return self.universe.calendar[self.bars['day']]
+
+    @property
+    def index(self):
+        return pd.DatetimeIndex(self.dates.astype('datetime64[D]').astype('datetime64[ns]'))
+
+    # Bars on or after `start`, still a view
+    def since(self, start):
+        first = np.searchsorted(self.dates, day_numbers([start])[0])
+        return CompactBars(self.universe, self.ticker, self.bars[first:])
+
+    # One column as a float64 Series indexed by date
+    def series(self, column):
+        return pd.Series(self.bars[column].astype('float64'), index=self.index, name=column)
+
+    # Plain float64 OHLCV frame, for code that needs pandas
+    def to_frame(self):
+        if self.empty:
+            return empty_ohlcv()
+        return pd.DataFrame({column: self.bars[column].astype('float64') for column in OHLCV_COLUMNS},
+                            index=self.index)
@@ -0,0 +1,193 @@
+import os
+import numpy as np
+import pandas as pd
+from providers import OHLCV_COLUMNS, empty_ohlcv
+
+# One record per daily bar; dates are stored as int64 nanoseconds
+BAR_DTYPE = np.dtype([
+    ('date', '<i8'),
+    ('Open', '<f8'),
+    ('High', '<f8'),
+    ('Low', '<f8'),
+    ('Close', '<f8'),
+    ('Volume', '<f8'),
+])
+
+
+# Convert between OHLCV frames and packed bar records
+def frame_to_records(frame):
+    records = np.empty(len(frame), dtype=BAR_DTYPE)
+    records['date'] = pd.DatetimeIndex(frame.index).asi8
+    for col in OHLCV_COLUMNS:
+        records[col] = frame[col].to_numpy(dtype='float64')
+    return records
+
+
+def records_to_frame(records):
+    if len(records) == 0:
+        return empty_ohlcv()
+    index = pd.DatetimeIndex(records['date'].astype('datetime64[ns]'))
+    return pd.DataFrame({col: records[col] for col in OHLCV_COLUMNS}, index=index)
+
+
+# Local on-disk store of raw daily bars, one memory-mapped .npy partition
+# per ticker. Only the missing head/tail is ever requested from the provider.
+# A small `.from` file next to each partition records the earliest date
+# already requested, so a start date on a holiday or weekend (no bar)
+# isn't fetched again on every update. A `.fetched` file records when the
+# tail was last fetched, so a bar stored while its session was still open
+# is fetched again until it is final.
+class OHLCVStore:
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def path(self, ticker, suffix='.npy'):
+        safe = ticker.replace(os.sep, '_').replace('/', '_')
+        return os.path.join(self.root, f"{safe}{suffix}")
+
+    # Earliest date whose bars are in the partition or known not to exist
+    def covered_from(self, ticker, records=None):
+        records = self.load_records(ticker) if records is None else records
+        first = pd.Timestamp(int(records['date'][0])) if len(records) else None
+        try:
+            with open(self.path(ticker, '.from')) as f:
+                marked = pd.Timestamp(f.read().strip())
+        except (OSError, ValueError):
+            return first
+        return marked if first is None else min(marked, first)
+
+    # Time of the last tail fetch, or None if it isn't known
+    def fetched_at(self, ticker):
+        try:
+            with open(self.path(ticker, '.fetched')) as f:
+                return pd.Timestamp(f.read().strip())
+        except (OSError, ValueError):
+            return None
+
+    # True if the last stored bar can't change any more: it was fetched after
+    # its day ended. Without a fetch time the bar may be partial.
+    def is_final(self, ticker, last):
+        fetched = self.fetched_at(ticker)
+        return fetched is not None and fetched >= last.normalize() + pd.Timedelta(days=1)
+
+    def _mark(self, ticker, suffix, stamp):
+        path = self.path(ticker, suffix)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(pd.Timestamp(stamp).isoformat())
+        os.replace(tmp_path, path)
+
+    def _mark_covered(self, ticker, start):
+        self._mark(ticker, '.from', start)
+
+    def _mark_fetched(self, ticker, end):
+        self._mark(ticker, '.fetched', end)
+
+    def load_records(self, ticker):
+        path = self.path(ticker)
+        if not os.path.exists(path):
+            return np.empty(0, dtype=BAR_DTYPE)
+        return np.load(path, mmap_mode='r')
+
+    def load(self, ticker, start=None, end=None):
+        records = self.load_records(ticker)
+        if start is not None or end is not None:
+            lo = 0 if start is None else np.searchsorted(records['date'], pd.Timestamp(start).value, 'left')
+            hi = len(records) if end is None else np.searchsorted(records['date'], pd.Timestamp(end).value, 'left')
+            records = records[lo:hi]
+        return records_to_frame(records)
+
+    def last_date(self, ticker):
+        records = self.load_records(ticker)
+        if len(records) == 0:
+            return None
+        return pd.Timestamp(int(records['date'][-1]))
+
+    # Merge new bars into the partition; new rows win on overlapping dates
+    def append(self, ticker, frame):
+        if frame.empty:
+            return
+        existing = np.asarray(self.load_records(ticker))
+        new = frame_to_records(frame.sort_index())
+        keep = existing[~np.isin(existing['date'], new['date'])]
+        merged = np.concatenate([keep, new])
+        merged = merged[np.argsort(merged['date'], kind='stable')]
+
+        # Write to a temp file and swap it in so readers never see a partial file
+        path = self.path(ticker)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.save(f, merged)
+        os.replace(tmp_path, path)
+
+    # Bring the partition up to date for [start, end) and return that window;
+    # `end` is the time of the update. A fresh store answers from disk
+    # without touching the provider.
+    def update(self, ticker, provider, start, end):
+        start = pd.Timestamp(start).normalize()
+        end = pd.Timestamp(end)
+        records = self.load_records(ticker)
+
+        if len(records) == 0:
+            self.append(ticker, provider.fetch(ticker, start, end))
+            self._mark_covered(ticker, start)
+            self._mark_fetched(ticker, end)
+            return self.load(ticker, start, end)
+
+        first = pd.Timestamp(int(records['date'][0]))
+        last = pd.Timestamp(int(records['date'][-1]))
+
+        # Missing history before the first stored bar
+        if start < self.covered_from(ticker, records):
+            self.append(ticker, provider.fetch(ticker, start, first))
+            self._mark_covered(ticker, start)
+
+        # Missing tail, or a last bar fetched before its session closed:
+        # refetch from the last stored bar
+        if is_stale(last, end) or not self.is_final(ticker, last):
+            self.append(ticker, provider.fetch(ticker, last, end))
+            self._mark_fetched(ticker, end)
+
+        return self.load(ticker, start, end)
+
+    # Same as update() for many tickers. Cold tickers share one grouped
+    # request and tickers needing only a tail share another.
+    def update_many(self, tickers, provider, start, end):
+        start = pd.Timestamp(start).normalize()
+        end = pd.Timestamp(end)
+        cold, heads, tails = [], {}, {}
+
+        for ticker in tickers:
+            records = self.load_records(ticker)
+            if len(records) == 0:
+                cold.append(ticker)
+                continue
+            first = pd.Timestamp(int(records['date'][0]))
+            last = pd.Timestamp(int(records['date'][-1]))
+            if start < self.covered_from(ticker, records):
+                heads[ticker] = first
+            if is_stale(last, end) or not self.is_final(ticker, last):
+                tails[ticker] = last
+
+        if cold:
+            for ticker, frame in provider.fetch_many(cold, start, end).items():
+                self.append(ticker, frame)
+                self._mark_covered(ticker, start)
+                self._mark_fetched(ticker, end)
+        if tails:
+            tail_start = min(tails.values())
+            for ticker, frame in provider.fetch_many(list(tails), tail_start, end).items():
+                self.append(ticker, frame)
+                self._mark_fetched(ticker, end)
+        for ticker, first in heads.items():
+            self.append(ticker, provider.fetch(ticker, start, first))
+            self._mark_covered(ticker, start)
+
+        return {ticker: self.load(ticker, start, end) for ticker in tickers}
+
+
+# True if a business day after `last` has closed before `end`
+def is_stale(last, end):
+    pending = pd.bdate_range(last + pd.Timedelta(days=1), pd.Timestamp(end).normalize() - pd.Timedelta(days=1))
+    return len(pending) > 0
@@ -0,0 +1,177 @@
+import numpy as np
+import pandas as pd
+from compact import CompactBars
+from swings import last_swing_anchors
+
+# Retracement ratios and the labels the UI shows for them
+FIB_RATIOS = np.array([0.0, 0.236, 0.382, 0.5, 0.618, 0.786, 1.0])
+
+# Named ratio sets; extensions project past the 100% anchor
+RATIO_SETS = {
+    'Retracements': FIB_RATIOS,
+    'Retracements + Extensions': np.array([0.0, 0.236, 0.382, 0.5, 0.618, 0.786, 1.0, 1.272, 1.618, 2.618]),
+}
+
+
+# '23.6%' style label for each ratio
+def ratio_labels(ratios):
+    return [f"{ratio * 100:g}%" for ratio in np.asarray(ratios, dtype='float64')]
+
+
+FIB_LABELS = ratio_labels(FIB_RATIOS)
+
+
+# Pull High/Low float arrays out of a DataFrame, CompactBars or an (n, 4)
+# OHLC array
+def high_low_arrays(ohlc):
+    if isinstance(ohlc, (pd.DataFrame, CompactBars)):
+        return np.asarray(ohlc['High'], dtype='float64'), np.asarray(ohlc['Low'], dtype='float64')
+    ohlc = np.asarray(ohlc, dtype='float64')
+    return ohlc[:, 1], ohlc[:, 2]
+
+
+# Rolling max/min over a fixed window in O(n) with the van Herk/Gil-Werman
+# block scheme: prefix and suffix scans inside blocks of `window` bars.
+# The first window - 1 positions are NaN.
+def rolling_extreme(values, window, op):
+    values = np.asarray(values, dtype='float64')
+    n = len(values)
+    out = np.full(n, np.nan)
+    if window < 1 or window > n:
+        return out
+
+    fill = -np.inf if op is np.maximum else np.inf
+    blocks = -(-n // window)
+    padded = np.full(blocks * window, fill)
+    padded[:n] = values
+    padded = padded.reshape(blocks, window)
+
+    prefix = op.accumulate(padded, axis=1).ravel()
+    suffix = op.accumulate(padded[:, ::-1], axis=1)[:, ::-1].ravel()
+
+    end = np.arange(window - 1, n)
+    out[window - 1:] = op(suffix[end - window + 1], prefix[end])
+    return out
+
+
+def rolling_max(values, window):
+    return rolling_extreme(values, window, np.maximum)
+
+
+def rolling_min(values, window):
+    return rolling_extreme(values, window, np.minimum)
+
+
+# Fibonacci levels for every bar and every lookback window at once.
+# Returns an array of shape (len(windows), n_bars, len(ratios)); row
+# [w, i] holds the levels for the window of windows[w] bars ending at bar i.
+#   'down': from the window high (0%) down to the window low (100%)
+#   'up':   from the bar's own low (0%) up to the window high (100%)
+def rolling_fibonacci_levels(ohlc, windows, direction='down', ratios=FIB_RATIOS):
+    high, low = high_low_arrays(ohlc)
+    windows = np.atleast_1d(windows)
+    window_high = np.array([rolling_max(high, int(window)) for window in windows])
+    if direction == 'down':
+        window_low = np.array([rolling_min(low, int(window)) for window in windows])
+    else:  # upward retracement from each bar's own low
+        window_low = np.where(np.isnan(window_high), np.nan, low)
+    return fibonacci_level_array(window_high, window_low, direction, ratios)
+
+
+# Levels for any number of high/low anchor pairs as one outer product:
+# `high` and `low` broadcast together to some shape S and the result has
+# shape S + (len(ratios),).
+#   'down': from the high (0%) down to the low (100%) and beyond
+#   'up':   from the low (0%) up to the high (100%) and beyond
+# The 100% level is the other anchor itself, not high - 1.0 * diff.
+def fibonacci_level_array(high, low, direction='down', ratios=FIB_RATIOS):
+    high = np.asarray(high, dtype='float64')[..., None]
+    low = np.asarray(low, dtype='float64')[..., None]
+    ratios = np.asarray(ratios, dtype='float64')
+    if direction == 'down':
+        start, end = high, low
+    else:  # upward retracement
+        start, end = low, high
+    return np.where(ratios == 1.0, end, start + ratios * (end - start))
+
+
+# Convert one row of levels back to the {'23.6%': price} form the UI uses
+def levels_to_dict(row, ratios=FIB_RATIOS):
+    return {label: float(value) for label, value in zip(ratio_labels(ratios), row)}
+
+
+# Retracement levels between a high and a low anchor
+def fibonacci_levels(high, low, direction='down', ratios=FIB_RATIOS):
+    return levels_to_dict(fibonacci_level_array(high, low, direction, ratios), ratios)
+
+
+# Levels for N tickers x M trailing windows x K ratios, kept as one array
+# and only turned into dicts or a table when asked for. Each window is the
+# last `window` bars of the ticker, with calculate_fibonacci_levels'
+# 'range' conventions.
+class FibonacciGrid:
+    __slots__ = ('tickers', 'windows', 'ratios', 'direction', 'levels')
+
+    def __init__(self, data_by_ticker, windows, direction='down', ratios=FIB_RATIOS):
+        self.tickers = list(data_by_ticker)
+        self.windows = np.atleast_1d(windows).astype(np.int64)
+        self.ratios = np.asarray(ratios, dtype='float64')
+        self.direction = direction
+
+        shape = (len(self.tickers), len(self.windows))
+        high, low = np.full(shape, np.nan), np.full(shape, np.nan)
+        for t, data in enumerate(data_by_ticker.values()):
+            highs, lows = high_low_arrays(data)
+            if len(highs) == 0:
+                continue
+            # Running extremes from the latest bar backwards; entry w - 1
+            # covers the last w bars
+            lookback = np.minimum(self.windows, len(highs)) - 1
+            high[t] = np.fmax.accumulate(highs[::-1])[lookback]
+            if direction == 'down':
+                low[t] = np.fmin.accumulate(lows[::-1])[lookback]
+            else:
+                low[t] = lows[-1]  # Latest trading day's low
+        self.levels = fibonacci_level_array(high, low, direction, self.ratios)
+
+    @property
+    def labels(self):
+        return ratio_labels(self.ratios)
+
+    def to_dict(self, ticker, window):
+        t = self.tickers.index(ticker)
+        w = int(np.flatnonzero(self.windows == window)[0])
+        return levels_to_dict(self.levels[t, w], self.ratios)
+
+    # Long-form table: one row per ticker, window and level
+    def to_frame(self):
+        n_tickers, n_windows, n_ratios = self.levels.shape
+        return pd.DataFrame({
+            'Ticker': np.repeat(self.tickers, n_windows * n_ratios),
+            'Window': np.tile(np.repeat(self.windows, n_ratios), n_tickers),
+            'Level': np.tile(self.labels, n_tickers * n_windows),
+            'Price': self.levels.ravel(),
+        })
+
+
+# Calculate Fibonacci retracement levels
+#   anchor='range': window high/low ('down'), or window high and the latest
+#                   bar's low ('up')
+#   anchor='swing': most recent ZigZag swing high and swing low, falling
+#                   back to 'range' if no swing moved by `threshold`
+def calculate_fibonacci_levels(data, direction='down', anchor='range', threshold=0.05, ratios=FIB_RATIOS):
+    if data.empty:
+        return {}
+
+    if anchor == 'swing':
+        anchors = last_swing_anchors(data, threshold)
+        if anchors is not None:
+            return fibonacci_levels(anchors[0], anchors[1], direction, ratios)
+
+    highs, lows = high_low_arrays(data)
+    high = np.nanmax(highs)
+    if direction == 'down':
+        low = np.nanmin(lows)
+    else:  # upward retracement
+        low = lows[-1]  # Latest trading day's low
+    return fibonacci_levels(high, low, direction, ratios)
@@ -0,0 +1,151 @@
+import math
+from collections import deque
+import numpy as np
+from compact import CompactBars
+from fib import fibonacci_levels
+
+
+# Calculate RSI over a whole series (or the closes of CompactBars).
+#   smoothing='sma':    simple rolling mean of gains and losses
+#   smoothing='wilder': Wilder's running average, seeded with the SMA
+def calculate_rsi(data, periods=14, smoothing='sma'):
+    if isinstance(data, CompactBars):
+        data = data.series('Close')
+
+    # Calculate price changes
+    delta = data.diff()
+
+    # Separate gains and losses
+    gain = delta.where(delta > 0, 0)
+    loss = -delta.where(delta < 0, 0)
+    if smoothing == 'wilder':
+        gain = _wilder_average(gain, periods)
+        loss = _wilder_average(loss, periods)
+    else:
+        gain = gain.rolling(window=periods).mean()
+        loss = loss.rolling(window=periods).mean()
+
+    # Calculate RS and RSI
+    rs = gain / loss
+    rsi = 100 - (100 / (1 + rs))
+    return rsi
+
+
+def _wilder_average(values, periods):
+    # avg[t] = (avg[t-1] * (periods - 1) + value[t]) / periods, i.e. an EWM
+    # with alpha = 1 / periods started from the first full-window mean
+    seeded = values.iloc[periods - 1:].copy()
+    if seeded.empty:
+        return values * np.nan
+    seeded.iloc[0] = values.iloc[:periods].mean()
+    return seeded.ewm(alpha=1 / periods, adjust=False).mean().reindex(values.index)
+
+
+# RSI updated one close at a time in O(1). Produces the same values as
+# calculate_rsi for the same smoothing.
+class IncrementalRSI:
+    __slots__ = ('periods', 'smoothing', 'count', 'last_close', 'gains', 'losses',
+                 'gain_sum', 'loss_sum', 'avg_gain', 'avg_loss', 'value')
+
+    def __init__(self, periods=14, smoothing='sma'):
+        self.periods = periods
+        self.smoothing = smoothing
+        self.count = 0
+        self.last_close = None
+        # Ring buffers of the last `periods` gains/losses for the SMA variant
+        self.gains = np.zeros(periods)
+        self.losses = np.zeros(periods)
+        self.gain_sum = self.loss_sum = 0.0
+        self.avg_gain = self.avg_loss = math.nan
+        self.value = math.nan
+
+    def update(self, close):
+        # The first bar counts as no change, as with diff() in calculate_rsi
+        delta = 0.0 if self.last_close is None else close - self.last_close
+        self.last_close = close
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else 0.0
+
+        slot = self.count % self.periods
+        self.gain_sum += gain - self.gains[slot]
+        self.loss_sum += loss - self.losses[slot]
+        self.gains[slot] = gain
+        self.losses[slot] = loss
+        self.count += 1
+
+        if self.count < self.periods:
+            return self.value
+        if self.smoothing == 'wilder' and self.count > self.periods:
+            self.avg_gain = (self.avg_gain * (self.periods - 1) + gain) / self.periods
+            self.avg_loss = (self.avg_loss * (self.periods - 1) + loss) / self.periods
+        else:
+            self.avg_gain = self.gain_sum / self.periods
+            self.avg_loss = self.loss_sum / self.periods
+
+        if self.avg_loss == 0:
+            self.value = 100.0 if self.avg_gain > 0 else math.nan
+        else:
+            self.value = 100 - 100 / (1 + self.avg_gain / self.avg_loss)
+        return self.value
+
+
+# Running high and low, over all bars seen so far or over the last `window`
+# bars. The windowed form keeps monotonic deques, so each update is
+# amortized O(1).
+class RunningHighLow:
+    __slots__ = ('window', 'count', 'high', 'low', 'highs', 'lows')
+
+    def __init__(self, window=None):
+        self.window = window
+        self.count = 0
+        self.high = -math.inf
+        self.low = math.inf
+        self.highs = deque()  # (position, high), highs decreasing
+        self.lows = deque()  # (position, low), lows increasing
+
+    def update(self, high, low):
+        position = self.count
+        self.count += 1
+        if self.window is None:
+            self.high = max(self.high, high)
+            self.low = min(self.low, low)
+            return self.high, self.low
+
+        while self.highs and self.highs[-1][1] <= high:
+            self.highs.pop()
+        self.highs.append((position, high))
+        while self.lows and self.lows[-1][1] >= low:
+            self.lows.pop()
+        self.lows.append((position, low))
+
+        expired = position - self.window
+        if self.highs[0][0] <= expired:
+            self.highs.popleft()
+        if self.lows[0][0] <= expired:
+            self.lows.popleft()
+        self.high = self.highs[0][1]
+        self.low = self.lows[0][1]
+        return self.high, self.low
+
+
+# Fibonacci levels kept current as bars arrive, with the same conventions
+# as calculate_fibonacci_levels(anchor='range')
+class IncrementalFibonacci:
+    __slots__ = ('direction', 'range', 'latest_low')
+
+    def __init__(self, direction='down', window=None):
+        self.direction = direction
+        self.range = RunningHighLow(window)
+        self.latest_low = math.nan
+
+    def update(self, high, low):
+        self.range.update(high, low)
+        self.latest_low = low
+        return self.levels()
+
+    def levels(self):
+        if self.range.count == 0:
+            return {}
+        if self.direction == 'down':
+            return fibonacci_levels(self.range.high, self.range.low, 'down')
+        return fibonacci_levels(self.range.high, self.latest_low, 'up')
@@ -0,0 +1,194 @@
+import time
+import numpy as np
+import pandas as pd
+from fib import FIB_RATIOS, fibonacci_levels
+from indicators import RunningHighLow
+from providers import OHLCV_COLUMNS
+
+# Bar intervals offered in intraday mode and their pandas frequencies
+INTERVALS = {
+    '1m': '1min',
+    '5m': '5min',
+}
+
+
+# Intraday bars for one ticker in growable NumPy buffers. The newest bar
+# may still be forming, so a bar with the same timestamp replaces it; only
+# bars that are complete are fed to the running high/low. Appends are
+# amortized O(1) per bar and never rebuild the series.
+#
+# A poll can reach back over several sessions. Metrics, levels and the
+# charted frame only cover the newest session: the first bar of a new
+# calendar day starts a new one and resets the running high/low.
+class IntradaySeries:
+    __slots__ = ('ticker', 'times', 'values', 'size', 'range', 'session_start')
+
+    def __init__(self, ticker, window=None, capacity=1024):
+        self.ticker = ticker
+        self.times = np.empty(capacity, dtype='datetime64[ns]')
+        self.values = np.empty((capacity, len(OHLCV_COLUMNS)))
+        self.size = 0
+        self.range = RunningHighLow(window)
+        self.session_start = 0
+
+    def __len__(self):
+        return self.size
+
+    @property
+    def last_time(self):
+        return pd.Timestamp(self.times[self.size - 1]) if self.size else None
+
+    # Merge polled bars; returns how many bars were added or actually
+    # changed, so repeating the newest bar unchanged counts as nothing
+    def append(self, bars):
+        if bars.empty:
+            return 0
+        times = pd.DatetimeIndex(bars.index).values
+        values = bars[OHLCV_COLUMNS].to_numpy(dtype='float64')
+        if self.size:
+            keep = times >= self.times[self.size - 1]
+            times, values = times[keep], values[keep]
+
+        changed = 0
+        for bar_time, bar in zip(times, values):
+            if self.size and bar_time == self.times[self.size - 1]:
+                if not np.array_equal(self.values[self.size - 1], bar, equal_nan=True):
+                    self.values[self.size - 1] = bar
+                    changed += 1
+                continue
+            if self.size and bar_time.astype('datetime64[D]') != self.times[self.size - 1].astype('datetime64[D]'):
+                self.range = RunningHighLow(self.range.window)
+                self.session_start = self.size
+            elif self.size:
+                completed = self.values[self.size - 1]
+                self.range.update(completed[1], completed[2])
+            if self.size == len(self.times):
+                self._grow()
+            self.times[self.size] = bar_time
+            self.values[self.size] = bar
+            self.size += 1
+            changed += 1
+        return changed
+
+    def _grow(self):
+        capacity = 2 * len(self.times)
+        self.times = np.resize(self.times, capacity)
+        self.values = np.resize(self.values, (capacity, len(OHLCV_COLUMNS)))
+
+    # Levels over the session's completed bars plus the forming one, with the same
+    # conventions as calculate_fibonacci_levels(anchor='range')
+    def levels(self, direction='down', ratios=FIB_RATIOS):
+        if not self.size:
+            return {}
+        bar_high, bar_low = self.values[self.size - 1, 1:3]
+        high = max(self.range.high, bar_high)
+        if direction == 'down':
+            return fibonacci_levels(high, min(self.range.low, bar_low), 'down', ratios)
+        return fibonacci_levels(high, bar_low, 'up', ratios)
+
+    # Price and change since the open of the newest session
+    def metrics(self):
+        first_open, last_close = self.values[self.session_start, 0], self.values[self.size - 1, 3]
+        return {
+            'price': float(last_close),
+            'change': float((last_close - first_open) / first_open * 100),
+            'bars': self.size - self.session_start,
+            'time': self.last_time,
+        }
+
+    # The newest session's bars as a DataFrame over the buffers, without copying
+    def frame(self):
+        start, stop = self.session_start, self.size
+        return pd.DataFrame(self.values[start:stop], index=pd.DatetimeIndex(self.times[start:stop]),
+                            columns=OHLCV_COLUMNS, copy=False)
+
+
+# Polls a provider for the latest intraday bars. Each poll starts at the
+# oldest ticker's newest bar, so a bar that was still forming gets revised.
+# The first poll looks back `lookback`: five days reaches past a weekend or
+# holiday to the last session and stays under Yahoo's 7-day limit for 1m bars.
+class PollingSource:
+    def __init__(self, provider, lookback=pd.Timedelta(days=5), clock=pd.Timestamp.now):
+        self.provider = provider
+        self.lookback = lookback
+        self.clock = clock
+        self.exhausted = False
+
+    def poll(self, tickers, since=None):
+        now = self.clock()
+        start = since if since is not None else now - self.lookback
+        return self.provider.fetch_many(tickers, start, now + pd.Timedelta(days=1))
+
+
+# Replays a recorded tick file (timestamp, ticker, price and optional
+# volume columns) `ticks_per_poll` ticks at a time, aggregated into bars
+# of `interval`. Each poll returns the bars its ticks touched, as they
+# stand after the last of those ticks.
+class TickReplay:
+    def __init__(self, ticks, interval='1m', ticks_per_poll=100):
+        if not isinstance(ticks, pd.DataFrame):
+            ticks = pd.read_csv(ticks, parse_dates=['timestamp'])
+        ticks = ticks.sort_values('timestamp', kind='stable').reset_index(drop=True)
+        if 'volume' not in ticks:
+            ticks['volume'] = 0.0
+        self.ticks_per_poll = ticks_per_poll
+        self.position = 0
+
+        # Every tick carries the bar it belongs to as of that tick, so a
+        # poll only has to pick the last tick of each touched bar
+        bar_time = ticks['timestamp'].dt.floor(INTERVALS.get(interval, interval))
+        groups = ticks.groupby([ticks['ticker'], bar_time], sort=False)['price']
+        self.ticks = pd.DataFrame({
+            'ticker': ticks['ticker'],
+            'bar_time': bar_time,
+            'Open': groups.transform('first'),
+            'High': groups.cummax(),
+            'Low': groups.cummin(),
+            'Close': ticks['price'],
+            'Volume': ticks['volume'].groupby([ticks['ticker'], bar_time], sort=False).cumsum(),
+        })
+
+    @property
+    def exhausted(self):
+        return self.position >= len(self.ticks)
+
+    def poll(self, tickers, since=None):
+        batch = self.ticks.iloc[self.position:self.position + self.ticks_per_poll]
+        self.position += len(batch)
+        latest = batch.drop_duplicates(['ticker', 'bar_time'], keep='last')
+        frames = {}
+        for ticker, bars in latest.groupby('ticker', sort=False):
+            if ticker in tickers:
+                frames[ticker] = bars.set_index(pd.DatetimeIndex(bars['bar_time']))[OHLCV_COLUMNS]
+        return frames
+
+
+# Intraday series for several tickers fed from one source. tick() polls
+# once and appends only what changed; update latency excludes the poll.
+class IntradayBoard:
+    def __init__(self, tickers, source, window=None, clock=time.perf_counter):
+        self.source = source
+        self.clock = clock
+        self.series = {ticker: IntradaySeries(ticker, window) for ticker in tickers}
+        self.ticks = 0
+        self.last_poll = 0.0
+        self.last_update = 0.0
+
+    @property
+    def exhausted(self):
+        return self.source.exhausted
+
+    # Poll the source and merge new bars; returns the tickers that changed
+    def tick(self):
+        times = [series.last_time for series in self.series.values()]
+        since = None if any(t is None for t in times) else min(times)
+
+        started = self.clock()
+        frames = self.source.poll(list(self.series), since)
+        polled = self.clock()
+        updated = [ticker for ticker, bars in frames.items()
+                   if ticker in self.series and self.series[ticker].append(bars)]
+        self.last_poll = polled - started
+        self.last_update = self.clock() - polled
+        self.ticks += 1
+        return updated
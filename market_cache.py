@@ -0,0 +1,133 @@
+import threading
+import pandas as pd
+from pandas.tseries.offsets import BDay
+from resample import OHLCVPyramid
+
+# Most recent business day on or before `now`; raw bars are only reloaded
+# when this boundary moves
+def trading_day(now):
+    day = pd.Timestamp(now).normalize()
+    if day.dayofweek >= 5:
+        day = day - BDay(1)
+    return day
+
+
+class CacheStats:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def as_dict(self):
+        return {'hits': self.hits, 'misses': self.misses, 'hit_rate': self.hit_rate}
+
+
+# Two-layer in-memory cache shared by every session of a server process:
+#   raw:       ticker -> full daily history, keyed by trading day
+#   resampled: (ticker, data version) -> daily/weekly/monthly/bi-monthly pyramid
+# Changing the start year only slices a cached frame.
+class MarketCache:
+    def __init__(self, store, provider, history_start):
+        self.store = store
+        self.provider = provider
+        self.history_start = pd.Timestamp(history_start)
+        self.raw_stats = CacheStats()
+        self.resampled_stats = CacheStats()
+        self._raw = {}  # ticker -> (trading day, version, frame)
+        self._pyramids = {}  # ticker -> (version, OHLCVPyramid)
+        self._inflight = {}  # ticker -> Event set when its fetch finishes
+        self._lock = threading.Lock()
+
+    # Full daily history per ticker. Concurrent callers asking for the same
+    # stale ticker share one upstream fetch; the lock is not held while fetching.
+    # `force` skips the trading-day cache so the store checks the tail again,
+    # e.g. for a last bar that was still forming.
+    def raw_many(self, tickers, now=None, force=False):
+        now = pd.Timestamp.now() if now is None else pd.Timestamp(now)
+        day = trading_day(now)
+        owned, waiting = [], []
+        with self._lock:
+            for ticker in tickers:
+                if not force and ticker in self._raw and self._raw[ticker][0] == day:
+                    self.raw_stats.hits += 1
+                    continue
+                self.raw_stats.misses += 1
+                if ticker in self._inflight:
+                    waiting.append((ticker, self._inflight[ticker]))
+                else:
+                    self._inflight[ticker] = threading.Event()
+                    owned.append(ticker)
+
+        if owned:
+            try:
+                frames = self.store.update_many(owned, self.provider, self.history_start, now)
+                with self._lock:
+                    for ticker, frame in frames.items():
+                        self._raw[ticker] = (day, data_version(frame), frame)
+            finally:
+                with self._lock:
+                    for ticker in owned:
+                        self._inflight.pop(ticker).set()
+
+        for ticker, done in waiting:
+            done.wait()
+
+        with self._lock:
+            for ticker in tickers:
+                if ticker not in self._raw:
+                    raise RuntimeError(f"Fetching {ticker} failed in another request")
+            return {ticker: self._raw[ticker][2] for ticker in tickers}
+
+    def resampled_many(self, tickers, freq, now=None):
+        pyramids = self.pyramids_many(tickers, now)
+        return {ticker: pyramids[ticker].level(freq) for ticker in tickers}
+
+    # One timeframe pyramid per ticker. When the raw bars only grew at the
+    # tail, a copy of the previous pyramid is updated instead of rebuilt.
+    def pyramids_many(self, tickers, now=None, force=False):
+        self.raw_many(tickers, now, force)
+        pyramids = {}
+        with self._lock:
+            for ticker in tickers:
+                _, version, frame = self._raw[ticker]
+                cached = self._pyramids.get(ticker)
+                if cached is not None and cached[0] == version:
+                    self.resampled_stats.hits += 1
+                else:
+                    self.resampled_stats.misses += 1
+                    if cached is not None and extends(cached[1].daily, frame):
+                        pyramid = cached[1].copy()
+                        pyramid.update(frame.loc[pyramid.daily.index[-1]:])
+                    else:
+                        pyramid = OHLCVPyramid(frame)
+                    # Replaces the entry for the previous data version
+                    cached = (version, pyramid)
+                    self._pyramids[ticker] = cached
+                pyramids[ticker] = cached[1]
+        return pyramids
+
+    # Bars from `start` onwards at the given frequency ('D', 'W', 'ME', '2ME')
+    def window_many(self, tickers, freq, start, now=None):
+        pyramids = self.pyramids_many(tickers, now)
+        return {ticker: pyramids[ticker].window(freq, start) for ticker in tickers}
+
+    def stats(self):
+        return {'raw': self.raw_stats.as_dict(), 'resampled': self.resampled_stats.as_dict()}
+
+
+# Identifies the content of a raw frame; unchanged bars keep their version
+def data_version(frame):
+    if frame.empty:
+        return (0, None)
+    return (len(frame), frame.index[-1].value, float(frame['Close'].iloc[-1]))
+
+
+# True if `new` is `old` with bars added (or the last bar replaced) at the tail
+def extends(old, new):
+    if old.empty or len(new) < len(old):
+        return False
+    return new.index[0] == old.index[0] and new.index[len(old) - 1] == old.index[-1]
@@ -1,7 +1,14 @@
+import argparse
 import yfinance as yf
-import pandas as pd
-import numpy as np
 from datetime import datetime, timedelta
+from fib import fibonacci_levels
+from indicators import calculate_rsi
+from report import write_report
+
+parser = argparse.ArgumentParser(description="NASDAQ 100 closing prices, RSI and Fibonacci levels")
+parser.add_argument("--period", help="yfinance period such as 1y or max (default: the past 30 days)")
+parser.add_argument("--output", help="Write the price/RSI table to this file instead of stdout")
+args = parser.parse_args()
 
 # Calculate date range
 end_date = datetime.now()
@@ -9,53 +16,27 @@ start_date = end_date - timedelta(days=30)
 
 # Fetch NASDAQ 100 data
 ndx = yf.Ticker("^NDX")
-hist = ndx.history(start=start_date, end=end_date)
-
-# Calculate RSI
-def calculate_rsi(data, periods=14):
-    # Calculate price changes
-    delta = data.diff()
-    
-    # Separate gains and losses
-    gain = (delta.where(delta > 0, 0)).rolling(window=periods).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=periods).mean()
-    
-    # Calculate RS and RSI
-    rs = gain / loss
-    rsi = 100 - (100 / (1 + rs))
-    return rsi
-
-# Calculate Fibonacci retracement levels
-def calculate_fibonacci_levels(data):
-    high = data['High'].max()
-    low = data['Low'].min()
-    diff = high - low
-    
-    levels = {
-        '0%': low,
-        '23.6%': low + 0.236 * diff,
-        '38.2%': low + 0.382 * diff,
-        '50%': low + 0.5 * diff,
-        '61.8%': low + 0.618 * diff,
-        '78.6%': low + 0.786 * diff,
-        '100%': high
-    }
-    return levels
+if args.period:
+    hist = ndx.history(period=args.period)
+else:
+    hist = ndx.history(start=start_date, end=end_date)
 
 # Calculate RSI
 rsi = calculate_rsi(hist['Close'])
 
-# Calculate Fibonacci levels
-fib_levels = calculate_fibonacci_levels(hist)
+# Calculate Fibonacci levels, measured up from the period low (0%) to the
+# period high (100%)
+fib_levels = fibonacci_levels(hist['High'].max(), hist['Low'].min(), 'up')
 
 # Display closing prices and RSI
-print("\nNASDAQ 100 Data for the Past 30 Days:")
+print(f"\nNASDAQ 100 Data for {'Period ' + args.period if args.period else 'the Past 30 Days'}:")
 print("=====================================")
-print("Date         | Closing Price | RSI")
-print("-------------------------------------")
-for date, row in hist.iterrows():
-    rsi_value = rsi[date] if not pd.isna(rsi[date]) else "N/A"
-    print(f"{date.strftime('%Y-%m-%d')} | {row['Close']:11.2f} | {rsi_value if isinstance(rsi_value, str) else f'{rsi_value:.2f}'}")
+if args.output:
+    with open(args.output, 'w') as f:
+        write_report(hist, rsi, f)
+    print(f"Wrote {len(hist)} rows to {args.output}")
+else:
+    write_report(hist, rsi)
 
 # Display Fibonacci retracement levels
 print("\nFibonacci Retracement Levels:")
@@ -0,0 +1,138 @@
+import numpy as np
+import pandas as pd
+
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+
+# Empty OHLCV frame with the same shape the rest of the code expects
+def empty_ohlcv():
+    return pd.DataFrame(columns=OHLCV_COLUMNS, index=pd.DatetimeIndex([]), dtype='float64')
+
+
+# Map yfinance's (column, ticker) columns to plain OHLCV columns
+def flatten_ohlcv(data, ticker, daily=True):
+    return split_ohlcv(data, [ticker], daily)[ticker]
+
+
+# Split a grouped download into one plain OHLCV frame per ticker. Each
+# ticker's columns are copied exactly once, straight from the download into
+# a single contiguous float64 block that backs the returned frame; no
+# intermediate frames or per-column reindexing. Daily bars get midnight
+# timestamps; intraday bars (daily=False) keep their exchange-local time.
+def split_ohlcv(data, tickers, daily=True):
+    if data.empty:
+        return {ticker: empty_ohlcv() for ticker in tickers}
+
+    index = _bar_index(data.index, daily)
+    if isinstance(data.columns, pd.MultiIndex):
+        frames = {}
+        for ticker in tickers:
+            keys = pd.MultiIndex.from_arrays([OHLCV_COLUMNS, [ticker] * len(OHLCV_COLUMNS)])
+            positions = data.columns.get_indexer(keys)
+            if (positions < 0).any():
+                frames[ticker] = empty_ohlcv()
+            else:
+                frames[ticker] = _ohlcv_block(data, positions, index)
+        return frames
+
+    # A flat frame can only hold a single ticker
+    ticker, = tickers
+    return {ticker: _ohlcv_block(data, data.columns.get_indexer(OHLCV_COLUMNS), index)}
+
+
+# Bars are stored tz-naive so they line up across tickers
+def _bar_index(index, daily=True):
+    index = pd.DatetimeIndex(index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return index.normalize() if daily else index
+
+
+# Copy the columns at `positions` into one (5, n) float64 block and wrap
+# it without another copy. Rows another ticker in the batch traded on but
+# this one did not (all NaN) are left out.
+def _ohlcv_block(data, positions, index):
+    columns = [data.iloc[:, position].to_numpy() for position in positions]
+    missing = np.isnan(columns[0].astype('float64', copy=False))
+    for column in columns[1:]:
+        missing &= np.isnan(column.astype('float64', copy=False))
+    rows = ~missing if missing.any() else slice(None)
+
+    block = np.empty((len(columns), len(index) - int(missing.sum())), dtype='float64')
+    for i, column in enumerate(columns):
+        block[i] = column[rows]
+    return pd.DataFrame(block.T, index=index[rows], columns=OHLCV_COLUMNS, copy=False)
+
+
+# yfinance logs failed downloads instead of raising; turn a download that
+# came back empty with recorded errors into an exception so it can be retried
+class ProviderError(Exception):
+    pass
+
+
+# Errors yfinance records when Yahoo answered but had no bars in the range
+# (a holiday, a weekend, before the open). That is a normal, empty result.
+NO_DATA_ERRORS = ('No data found for this date range', 'No price data found')
+
+
+def _raise_download_errors(data):
+    import yfinance as yf
+    errors = dict(getattr(yf.shared, '_ERRORS', {}) or {})
+    errors = {ticker: error for ticker, error in errors.items() if not str(error).startswith(NO_DATA_ERRORS)}
+    if data.empty and errors:
+        raise ProviderError('; '.join(f"{ticker}: {error}" for ticker, error in sorted(errors.items())))
+
+
+# Bars straight from Yahoo Finance, daily unless another yfinance
+# `interval` such as '1m' or '5m' is given. Each call is a single attempt;
+# wrap it in throttle.ThrottledProvider for rate limiting and retries.
+# yfinance is imported on the first download, so processes that never
+# fetch (shared snapshot readers, tests) don't pay for loading it.
+class YFinanceProvider:
+    def __init__(self, timeout=30, interval='1d'):
+        self.timeout = timeout
+        self.interval = interval
+
+    def fetch(self, ticker, start, end):
+        import yfinance as yf
+        data = yf.download(ticker, start=start, end=end, interval=self.interval, timeout=self.timeout,
+                           progress=False)
+        _raise_download_errors(data)
+        return flatten_ohlcv(data, ticker, self.interval == '1d')
+
+    # One grouped request for the whole batch; yfinance fans out the
+    # per-ticker downloads on its own threads
+    def fetch_many(self, tickers, start, end):
+        import yfinance as yf
+        tickers = list(tickers)
+        data = yf.download(tickers, start=start, end=end, interval=self.interval, timeout=self.timeout,
+                           group_by='column', threads=True, progress=False)
+        _raise_download_errors(data)
+        return split_ohlcv(data, tickers, self.interval == '1d')
+
+
+# Serves bars from in-memory frames and records every request, so the
+# store can be exercised without network access
+class FakeProvider:
+    def __init__(self, frames, daily=True):
+        self.frames = {ticker: flatten_ohlcv(frame, ticker, daily) for ticker, frame in frames.items()}
+        self.calls = []
+
+    def fetch(self, ticker, start, end):
+        self.calls.append((ticker, pd.Timestamp(start), pd.Timestamp(end)))
+        frame = self.frames.get(ticker)
+        if frame is None:
+            return empty_ohlcv()
+        # Same half-open [start, end) window as yf.download
+        mask = (frame.index >= pd.Timestamp(start)) & (frame.index < pd.Timestamp(end))
+        return frame[mask].copy()
+
+    def fetch_many(self, tickers, start, end):
+        tickers = list(tickers)
+        self.calls.append((tuple(tickers), pd.Timestamp(start), pd.Timestamp(end)))
+        frames = {}
+        for ticker in tickers:
+            frame = self.frames.get(ticker, empty_ohlcv())
+            mask = (frame.index >= pd.Timestamp(start)) & (frame.index < pd.Timestamp(end))
+            frames[ticker] = frame[mask].copy()
+        return frames
@@ -0,0 +1,105 @@
+import numpy as np
+import pandas as pd
+from fib import FIB_RATIOS, fibonacci_level_array
+
+
+# Sparse table over one column: after an O(n log n) build, the position of
+# the max (or min) of any inclusive range [lo, hi] is found in O(1).
+# Queries are vectorized, so lo/hi may be arrays.
+class SparseTable:
+    def __init__(self, values, op='max'):
+        self.values = np.asarray(values, dtype='float64')
+        self.op = op
+        n = len(self.values)
+        levels = max(1, int(np.log2(n)) + 1) if n else 1
+
+        # table[k, i] is the position of the best value in [i, i + 2**k)
+        self.table = np.zeros((levels, max(n, 1)), dtype=np.int32)
+        self.table[0, :n] = np.arange(n)
+        for k in range(1, levels):
+            span = 1 << k
+            count = n - span + 1
+            left = self.table[k - 1, :count]
+            right = self.table[k - 1, (span >> 1):(span >> 1) + count]
+            self.table[k, :count] = self._pick(left, right)
+
+    # Best of two candidate positions; ties keep the earlier one like idxmax
+    def _pick(self, left, right):
+        if self.op == 'max':
+            better = self.values[right] > self.values[left]
+        else:
+            better = self.values[right] < self.values[left]
+        return np.where(better, right, left)
+
+    # Position of the best value in each range, or -1 where the range is
+    # empty (hi < lo)
+    def argquery(self, lo, hi):
+        lo, hi = np.broadcast_arrays(np.asarray(lo), np.asarray(hi))
+        empty = hi < lo
+        if not len(self.values):
+            return np.full(lo.shape, -1)
+        lo = np.where(empty, 0, lo)
+        hi = np.where(empty, 0, hi)
+        k = np.log2(hi - lo + 1).astype(np.int64)
+        left = self.table[k, lo]
+        right = self.table[k, hi - (1 << k) + 1]
+        return np.where(empty, -1, self._pick(left, right))
+
+    # Best value in each range, NaN where the range is empty
+    def query(self, lo, hi):
+        positions = self.argquery(lo, hi)
+        if not len(self.values):
+            return np.full(positions.shape, np.nan)
+        return np.where(positions < 0, np.nan, self.values[positions])
+
+
+# Range max/min index over one ticker's daily bars, answering date-window
+# high, low, argmax and argmin without rescanning the frame. Windows with
+# no bars give NaN highs/lows and NaT dates.
+class RangeQueryIndex:
+    def __init__(self, data):
+        self.dates = pd.DatetimeIndex(data.index)
+        self.low_values = data['Low'].to_numpy(dtype='float64')
+        self.highs = SparseTable(data['High'], 'max')
+        self.lows = SparseTable(self.low_values, 'min')
+
+    def __len__(self):
+        return len(self.dates)
+
+    # Inclusive bar positions for [start, end] date windows; windows with no
+    # bars come back with hi < lo
+    def positions(self, start, end):
+        lo = self.dates.searchsorted(pd.DatetimeIndex(np.atleast_1d(start)), 'left')
+        hi = self.dates.searchsorted(pd.DatetimeIndex(np.atleast_1d(end)), 'right') - 1
+        return lo, hi
+
+    def high(self, start, end):
+        return self.highs.query(*self.positions(start, end))
+
+    def low(self, start, end):
+        return self.lows.query(*self.positions(start, end))
+
+    def idxmax(self, start, end):
+        return self.dates.take(self.highs.argquery(*self.positions(start, end)), allow_fill=True, fill_value=pd.NaT)
+
+    def idxmin(self, start, end):
+        return self.dates.take(self.lows.argquery(*self.positions(start, end)), allow_fill=True, fill_value=pd.NaT)
+
+    # Fibonacci levels for many date windows at once, shape (n_windows, len(ratios)),
+    # with the same 'down'/'up' conventions as calculate_fibonacci_levels
+    def fibonacci_levels(self, start, end, direction='down', ratios=FIB_RATIOS):
+        lo, hi = self.positions(start, end)
+        if len(self) == 0:
+            return np.full((len(lo), len(ratios)), np.nan)
+        empty = hi < lo
+        lo = np.where(empty, 0, lo)
+        hi = np.where(empty, 0, hi)
+
+        high = self.highs.query(lo, hi)
+        if direction == 'down':
+            low = self.lows.query(lo, hi)
+        else:  # upward retracement from the window's last low
+            low = self.low_values[hi]
+        levels = fibonacci_level_array(high, low, direction, ratios)
+        levels[empty] = np.nan
+        return levels
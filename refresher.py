@@ -0,0 +1,177 @@
+import threading
+import time
+from types import MappingProxyType
+import pandas as pd
+from throttle import CircuitOpenError
+from timing import Timings
+
+
+# Immutable view of one ticker's data at a point in time. Sessions share
+# these objects and must treat the frames as read-only.
+class Snapshot:
+    __slots__ = ('ticker', 'version', 'refreshed_at', 'daily', 'pyramid')
+
+    def __init__(self, ticker, version, refreshed_at, daily, pyramid):
+        self.ticker = ticker
+        self.version = version
+        self.refreshed_at = refreshed_at
+        self.daily = daily
+        self.pyramid = pyramid
+
+    def window(self, freq, start):
+        return self.pyramid.window(freq, start)
+
+
+# Keeps the tracked tickers fresh from a background thread and publishes a
+# new read-only mapping of snapshots after every refresh. Readers only ever
+# swap in the published mapping, so a page load never waits on the network.
+# With a `publisher`, each published mapping is also written out for other
+# processes (see shared_snapshots.py).
+class BackgroundRefresher:
+    def __init__(self, cache, tickers=(), interval=300, clock=time.time, timings=None, publisher=None):
+        self.cache = cache
+        self.publisher = publisher
+        self.timings = timings or Timings(enabled=False)
+        self.interval = interval
+        self.clock = clock
+        self.refreshes = 0
+        self.failures = 0
+        self.reads = 0
+        self.last_error = None
+        self.last_refresh = None
+        self._tracked = list(dict.fromkeys(tickers))
+        self._snapshots = MappingProxyType({})
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._ready = threading.Event()
+        self._thread = None
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="market-refresher", daemon=True)
+                self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    # Start tracking more tickers; the worker picks them up right away
+    def track(self, tickers):
+        with self._lock:
+            added = [ticker for ticker in tickers if ticker not in self._tracked]
+            self._tracked.extend(added)
+        if added:
+            self._ready.clear()
+            self._wake.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.refresh()
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    # Fetch what is stale and publish new snapshots. Every pass checks the
+    # store's tail, so a bar that was still forming is refreshed during the
+    # day. The tickers share one grouped fetch; if it fails they are retried
+    # one at a time, so a bad ticker only keeps its own previous snapshot
+    # published.
+    def refresh(self, now=None):
+        with self._lock:
+            tickers = list(self._tracked)
+        errors = {}
+        with self.timings.span("refresh"):
+            try:
+                pyramids = self.cache.pyramids_many(tickers, now, force=True)
+            except CircuitOpenError as e:
+                # Upstream is down for everyone; don't queue more calls
+                pyramids, errors = {}, dict.fromkeys(tickers, f"{type(e).__name__}: {e}")
+            except Exception as e:
+                pyramids = {}
+                if len(tickers) == 1:
+                    errors = {tickers[0]: f"{type(e).__name__}: {e}"}
+                else:
+                    pyramids, errors = self._refresh_each(tickers, now)
+
+        refreshed_at = self.clock()
+        snapshots = dict(self._snapshots)
+        for ticker, pyramid in pyramids.items():
+            current = snapshots.get(ticker)
+            if current is None or current.pyramid is not pyramid:
+                version = current.version + 1 if current is not None else 1
+                snapshots[ticker] = Snapshot(ticker, version, refreshed_at, pyramid.daily, pyramid)
+        self._snapshots = MappingProxyType(snapshots)
+        if errors:
+            self.failures += 1
+            # One message when every ticker failed the same way
+            messages = set(errors.values())
+            if len(errors) == len(tickers) and len(messages) == 1:
+                self.last_error = messages.pop()
+            else:
+                self.last_error = '; '.join(f"{ticker}: {error}" for ticker, error in errors.items())
+        else:
+            self.refreshes += 1
+            self.last_refresh = refreshed_at
+            self.last_error = None
+        self._share()
+
+        # Tickers tracked while this refresh ran get their own pass first
+        with self._lock:
+            pending = any(ticker not in tickers for ticker in self._tracked)
+        if pending:
+            self._wake.set()
+        else:
+            self._ready.set()
+        return self.last_error is None
+
+    def _refresh_each(self, tickers, now):
+        pyramids, errors = {}, {}
+        for position, ticker in enumerate(tickers):
+            try:
+                pyramids.update(self.cache.pyramids_many([ticker], now, force=True))
+            except CircuitOpenError as e:
+                errors.update(dict.fromkeys(tickers[position:], f"{type(e).__name__}: {e}"))
+                break
+            except Exception as e:
+                errors[ticker] = f"{type(e).__name__}: {e}"
+        return pyramids, errors
+
+    def _share(self):
+        if self.publisher is None:
+            return
+        try:
+            with self.timings.span("publish"):
+                self.publisher.publish(self._snapshots, self.last_error)
+        except OSError as e:
+            self.failures += 1
+            self.last_error = f"{type(e).__name__}: {e}"
+
+    # Block until a refresh attempt has covered every tracked ticker (only on
+    # a cold process, or after tracking new tickers)
+    def wait_ready(self, timeout=None):
+        return self._ready.wait(timeout)
+
+    def snapshot(self, ticker):
+        self.reads += 1
+        return self._snapshots.get(ticker)
+
+    def snapshots(self, tickers):
+        snapshots = self._snapshots
+        self.reads += len(tickers)
+        return {ticker: snapshots.get(ticker) for ticker in tickers}
+
+    def stats(self):
+        last = self.last_refresh
+        return {
+            'tracked': len(self._tracked),
+            'published': len(self._snapshots),
+            'refreshes': self.refreshes,
+            'failures': self.failures,
+            'reads': self.reads,
+            'last_refresh': pd.Timestamp(last, unit='s').strftime('%Y-%m-%d %H:%M:%S') if last else None,
+            'last_error': self.last_error,
+        }
@@ -0,0 +1,39 @@
+import sys
+import numpy as np
+import pandas as pd
+
+REPORT_HEADER = [
+    "Date         | Closing Price | RSI",
+    "-------------------------------------",
+]
+
+
+# Format a block of report rows in one columnar pass:
+# "YYYY-MM-DD |    12345.67 | 55.12" with N/A for missing RSI
+def format_report_rows(dates, closes, rsi):
+    date_text = np.asarray(pd.DatetimeIndex(dates).strftime('%Y-%m-%d'), dtype=str)
+    close_text = np.char.mod('%11.2f', np.asarray(closes, dtype='float64'))
+    rsi = np.asarray(rsi, dtype='float64')
+    rsi_text = np.where(np.isnan(rsi), 'N/A', np.char.mod('%.2f', rsi))
+    return np.char.add(np.char.add(np.char.add(date_text, ' | '), np.char.add(close_text, ' | ')), rsi_text)
+
+
+# Write the closing price / RSI table for `hist`, `chunk_size` rows at a
+# time, so memory stays flat however long the history is
+def write_report(hist, rsi, out=None, chunk_size=4096):
+    out = sys.stdout if out is None else out
+    out.write('\n'.join(REPORT_HEADER) + '\n')
+
+    # Align RSI with the bars once instead of a label lookup per row
+    rsi = pd.Series(rsi).reindex(hist.index).to_numpy(dtype='float64')
+    closes = hist['Close'].to_numpy(dtype='float64')
+    for start in range(0, len(hist), chunk_size):
+        stop = start + chunk_size
+        rows = format_report_rows(hist.index[start:stop], closes[start:stop], rsi[start:stop])
+        out.write('\n'.join(rows.tolist()) + '\n')
+
+
+# Whole report as one string
+def render_report(hist, rsi):
+    rows = format_report_rows(hist.index, hist['Close'], pd.Series(rsi).reindex(hist.index))
+    return '\n'.join(REPORT_HEADER + rows.tolist())
@@ -0,0 +1,133 @@
+import numpy as np
+import pandas as pd
+
+OHLCV_AGG = {
+    'Open': 'first',
+    'High': 'max',
+    'Low': 'min',
+    'Close': 'last',
+    'Volume': 'sum'
+}
+
+# Timeframes offered in the dashboard and their pandas frequencies
+TIMEFRAMES = {
+    'Daily': 'D',
+    'Weekly': 'W',
+    'Monthly': 'ME',
+    'Bi-monthly': '2ME',
+}
+
+
+# Resample daily bars to a coarser OHLCV frequency
+def resample_ohlcv(data, freq):
+    return data.resample(freq).agg(OHLCV_AGG)
+
+
+# Months since 1970-01 for each date
+def month_numbers(index):
+    return pd.DatetimeIndex(index).values.astype('datetime64[M]').astype(np.int64)
+
+
+# Bucket label (period end date) for each daily bar, matching
+# resample(freq). '2ME' buckets are counted from `origin_month`, the month
+# of the first bar, as pandas does.
+def bucket_labels(index, freq, origin_month):
+    index = pd.DatetimeIndex(index).normalize()
+    if freq == 'D':
+        return index.values
+    if freq == 'W':
+        return (index + pd.to_timedelta(6 - index.dayofweek, unit='D')).values
+
+    months = month_numbers(index)
+    if freq == '2ME':
+        months = origin_month + (months - origin_month + 1) // 2 * 2
+    elif freq != 'ME':
+        raise ValueError(f"Unsupported frequency: {freq}")
+    return (months + 1).astype('datetime64[M]').astype('datetime64[ns]') - np.timedelta64(1, 'D')
+
+
+# Aggregate sorted daily bars into one OHLCV row per run of equal labels
+def aggregate_ohlcv(data, labels):
+    if len(data) == 0:
+        return data.iloc[:0]
+    starts = np.flatnonzero(np.r_[True, labels[1:] != labels[:-1]])
+    ends = np.r_[starts[1:], len(data)] - 1
+    return pd.DataFrame({
+        'Open': data['Open'].to_numpy()[starts],
+        'High': np.maximum.reduceat(data['High'].to_numpy(), starts),
+        'Low': np.minimum.reduceat(data['Low'].to_numpy(), starts),
+        'Close': data['Close'].to_numpy()[ends],
+        'Volume': np.add.reduceat(data['Volume'].to_numpy(), starts),
+    }, index=pd.DatetimeIndex(labels[starts]))
+
+
+# Daily, weekly, monthly and bi-monthly bars built from the same daily
+# history. New daily bars only rebuild the buckets they fall into.
+class OHLCVPyramid:
+    def __init__(self, daily, freqs=('W', 'ME', '2ME')):
+        self.freqs = tuple(freqs)
+        self._build(daily)
+
+    def _build(self, daily):
+        self.daily = daily
+        self.origin_month = int(month_numbers(daily.index[:1])[0]) if len(daily) else 0
+        self.levels = {freq: self._aggregate(daily, freq) for freq in self.freqs}
+
+    def _aggregate(self, data, freq):
+        return aggregate_ohlcv(data, bucket_labels(data.index, freq, self.origin_month))
+
+    # Pyramid over levels that were already aggregated, e.g. frames mapped
+    # from a shared snapshot file; nothing is recomputed or copied
+    @classmethod
+    def from_levels(cls, daily, levels, origin_month):
+        pyramid = cls.__new__(cls)
+        pyramid.freqs = tuple(levels)
+        pyramid.daily = daily
+        pyramid.origin_month = origin_month
+        pyramid.levels = dict(levels)
+        return pyramid
+
+    # Shallow copy that can be updated without touching this pyramid
+    def copy(self):
+        pyramid = OHLCVPyramid.__new__(OHLCVPyramid)
+        pyramid.freqs = self.freqs
+        pyramid.daily = self.daily
+        pyramid.origin_month = self.origin_month
+        pyramid.levels = dict(self.levels)
+        return pyramid
+
+    def level(self, freq):
+        if freq == 'D':
+            return self.daily
+        return self.levels[freq]
+
+    # Merge new daily bars (later bars, or a replacement for the last one)
+    def update(self, new_bars):
+        if new_bars.empty:
+            return
+        new_bars = new_bars.sort_index()
+        first_new = new_bars.index[0]
+        if self.daily.empty or first_new < self.daily.index[0]:
+            self._build(pd.concat([self.daily[self.daily.index > new_bars.index[-1]], new_bars]).sort_index())
+            return
+
+        self.daily = pd.concat([self.daily[self.daily.index < first_new], new_bars])
+        for freq in self.freqs:
+            # Keep every bucket that ends before the first new bar's bucket
+            first_label = bucket_labels([first_new], freq, self.origin_month)[0]
+            frame = self.levels[freq]
+            kept = frame[frame.index < first_label]
+            tail = self.daily if kept.empty else self.daily[self.daily.index > kept.index[-1]]
+            self.levels[freq] = pd.concat([kept, self._aggregate(tail, freq)])
+
+    # Bars from `start` onwards; the first bucket is rebuilt from daily bars
+    # so it doesn't include days before `start`
+    def window(self, freq, start):
+        start = pd.Timestamp(start)
+        if freq == 'D':
+            return self.daily.loc[start:]
+        frame = self.levels[freq].loc[start:]
+        if frame.empty:
+            return frame
+        head = self._aggregate(self.daily.loc[start:frame.index[0]], freq)
+        return pd.concat([head, frame.iloc[1:]])
@@ -0,0 +1,173 @@
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from data_store import OHLCVStore
+from fib import FIB_LABELS, calculate_fibonacci_levels
+from indicators import calculate_rsi
+from providers import YFinanceProvider
+from range_index import RangeQueryIndex
+from throttle import ThrottledProvider
+
+DEFAULT_TICKERS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "nasdaq100_tickers.txt")
+
+
+# Read tickers from a file, one per line; blank lines and # comments are skipped
+def read_tickers(path):
+    with open(path) as f:
+        lines = (line.split('#', 1)[0].strip() for line in f)
+        return [line for line in lines if line]
+
+
+# Load one ticker's daily bars from the local store or from a fixture
+# directory of <ticker>.csv files
+def load_bars(source, path, ticker, start=None):
+    if source == 'store':
+        return OHLCVStore(path).load(ticker, start=start)
+    csv_path = os.path.join(path, f"{ticker}.csv")
+    if not os.path.exists(csv_path):
+        return pd.DataFrame()
+    data = pd.read_csv(csv_path, index_col=0, parse_dates=True)
+    return data.loc[start:] if start is not None else data
+
+
+# Bring the local store up to date for the whole universe, a batch of
+# tickers per request, through the rate-limited provider
+def update_store(tickers, path, start, provider=None, batch_size=20, now=None):
+    provider = provider or ThrottledProvider(YFinanceProvider(timeout=30))
+    now = pd.Timestamp.now() if now is None else pd.Timestamp(now)
+    store = OHLCVStore(path)
+    for i in range(0, len(tickers), batch_size):
+        store.update_many(tickers[i:i + batch_size], provider, pd.Timestamp(start), now)
+    return provider
+
+
+# Scan one ticker; runs in a worker process, so it loads its own bars
+def scan_ticker(source, path, ticker, start=None, rsi_periods=14, smoothing='sma'):
+    data = load_bars(source, path, ticker, start)
+    if data.empty:
+        return {'Ticker': ticker}
+
+    rsi = calculate_rsi(data['Close'], rsi_periods, smoothing)
+    row = {
+        'Ticker': ticker,
+        'Date': data.index[-1].strftime('%Y-%m-%d'),
+        'Bars': len(data),
+        'Close': data['Close'].iloc[-1],
+        'RSI': rsi.iloc[-1],
+    }
+    for direction in ('down', 'up'):
+        for level, value in calculate_fibonacci_levels(data, direction).items():
+            row[f"{direction.capitalize()} {level}"] = value
+    return row
+
+
+# Levels for every window from a start date to the last bar, one row per
+# start. One range index per ticker answers all the windows, so each extra
+# start costs O(1) instead of another scan of the bars.
+def sweep_ticker(source, path, ticker, starts):
+    data = load_bars(source, path, ticker)
+    if data.empty:
+        return [{'Ticker': ticker}]
+
+    starts = pd.DatetimeIndex(starts)
+    end = data.index[-1]
+    index = RangeQueryIndex(data)
+    lo, hi = index.positions(starts, end)
+    rows = pd.DataFrame({
+        'Ticker': ticker,
+        'Start': starts.strftime('%Y-%m-%d'),
+        'Bars': np.maximum(hi - lo + 1, 0),
+        'High': index.high(starts, end),
+        'High Date': index.idxmax(starts, end).strftime('%Y-%m-%d'),
+        'Low': index.low(starts, end),
+        'Low Date': index.idxmin(starts, end).strftime('%Y-%m-%d'),
+    })
+    for direction in ('down', 'up'):
+        levels = index.fibonacci_levels(starts, end, direction)
+        for label, column in zip(FIB_LABELS, levels.T):
+            rows[f"{direction.capitalize()} {label}"] = column
+    return rows.to_dict('records')
+
+
+# Run `func` over each ticker's arguments, in worker processes unless workers == 1
+def map_tickers(func, args, workers=None):
+    if workers == 1:
+        return list(map(func, *args))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        chunksize = max(1, len(args[0]) // ((workers or os.cpu_count() or 1) * 4))
+        return list(pool.map(func, *args, chunksize=chunksize))
+
+
+def scan(tickers, source, path, start=None, rsi_periods=14, smoothing='sma', workers=None):
+    n = len(tickers)
+    args = ([source] * n, [path] * n, tickers, [start] * n, [rsi_periods] * n, [smoothing] * n)
+    return pd.DataFrame(map_tickers(scan_ticker, args, workers))
+
+
+# Levels for each ticker from every start in `starts` to its last bar
+def sweep(tickers, source, path, starts, workers=None):
+    n = len(tickers)
+    rows = map_tickers(sweep_ticker, ([source] * n, [path] * n, tickers, [starts] * n), workers)
+    return pd.DataFrame([row for ticker_rows in rows for row in ticker_rows])
+
+
+# '2008:2024' -> Jan 1 of every year from 2008 to 2024
+def parse_start_years(value):
+    first, _, last = value.partition(':')
+    return pd.to_datetime([f"{year}-01-01" for year in range(int(first), int(last or first) + 1)])
+
+
+def write_results(results, output):
+    if output == '-':
+        results.to_csv(sys.stdout, index=False)
+    elif output.endswith('.parquet'):
+        results.to_parquet(output, index=False)
+    else:
+        results.to_csv(output, index=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compute RSI and Fibonacci levels for a ticker universe.")
+    parser.add_argument("tickers", nargs="*", help="Tickers to scan (default: --tickers-file)")
+    parser.add_argument("--tickers-file", default=DEFAULT_TICKERS_FILE, help="File with one ticker per line")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--store", default=os.environ.get("FIB_DATA_DIR", "data"), help="Local bar store directory")
+    source.add_argument("--fixtures", help="Directory of <ticker>.csv daily bar files")
+    parser.add_argument("--start", help="First date to include (YYYY-MM-DD)")
+    parser.add_argument("--start-years", metavar="FIRST:LAST",
+                        help="Instead of one row per ticker, levels from Jan 1 of each year to the last bar")
+    parser.add_argument("--update", action="store_true", help="Download missing bars into --store before scanning")
+    parser.add_argument("--rsi-periods", type=int, default=14)
+    parser.add_argument("--smoothing", choices=["sma", "wilder"], default="sma")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("--output", default="scan_results.csv", help="CSV or .parquet path, or - for stdout")
+    args = parser.parse_args(argv)
+
+    tickers = args.tickers or read_tickers(args.tickers_file)
+    source, path = ('fixtures', args.fixtures) if args.fixtures else ('store', args.store)
+
+    if args.update:
+        if args.fixtures:
+            parser.error("--update only applies to --store")
+        provider = update_store(tickers, args.store, args.start or "2008-01-01")
+        print(f"Updated store: {provider.stats()}", file=sys.stderr)
+
+    start_time = time.perf_counter()
+    if args.start_years:
+        results = sweep(tickers, source, path, parse_start_years(args.start_years), args.workers)
+    else:
+        results = scan(tickers, source, path, args.start, args.rsi_periods, args.smoothing, args.workers)
+    elapsed = time.perf_counter() - start_time
+    write_results(results, args.output)
+
+    missing = results.drop_duplicates('Ticker')['Bars'].isna().sum() if 'Bars' in results else len(results)
+    print(f"Scanned {len(tickers)} tickers ({missing} without data) in {elapsed:.2f} seconds "
+          f"({len(tickers) / elapsed:.1f} tickers/second)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+from types import MappingProxyType
+import numpy as np
+import pandas as pd
+from data_store import OHLCVStore
+from market_cache import MarketCache
+from providers import OHLCV_COLUMNS, YFinanceProvider
+from refresher import BackgroundRefresher, Snapshot
+from resample import OHLCVPyramid
+from throttle import ThrottledProvider
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, every process publishes
+    fcntl = None
+
+MANIFEST = 'manifest.json'
+LOCK = 'publisher.lock'
+
+
+# Every timeframe of a pyramid packed into one (6, n) int64 array: row 0
+# holds the dates in nanoseconds, rows 1-5 the OHLCV floats bit for bit.
+# Returns the array and {freq: [start, stop]} column ranges ('D' is daily).
+def pack_pyramid(pyramid):
+    frames = {'D': pyramid.daily, **pyramid.levels}
+    packed = np.empty((1 + len(OHLCV_COLUMNS), sum(map(len, frames.values()))), dtype=np.int64)
+    values = packed[1:].view('float64')
+    levels, offset = {}, 0
+    for freq, frame in frames.items():
+        stop = offset + len(frame)
+        packed[0, offset:stop] = pd.DatetimeIndex(frame.index).asi8
+        values[:, offset:stop] = frame[OHLCV_COLUMNS].to_numpy(dtype='float64').T
+        levels[freq] = [offset, stop]
+        offset = stop
+    return packed, levels
+
+
+# One timeframe of a packed array as a DataFrame that views it
+def unpack_frame(packed, start, stop):
+    index = pd.DatetimeIndex(packed[0, start:stop].view('datetime64[ns]'), copy=False)
+    return pd.DataFrame(packed[1:, start:stop].view('float64').T, index=index, columns=OHLCV_COLUMNS, copy=False)
+
+
+def read_manifest(root):
+    try:
+        with open(os.path.join(root, MANIFEST)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+# Write to a temp file and swap it in so readers never see a partial file
+def _replace(path, write, mode='wb'):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, mode) as f:
+        write(f)
+    os.replace(tmp_path, path)
+
+
+# Writes refresher snapshots to a shared directory: one immutable .npy file
+# per ticker version, then a manifest naming the current files. Swapping
+# the manifest in is the atomic publish; a ticker's previous file is kept
+# one more generation for readers that are still attaching to it.
+class SnapshotPublisher:
+    def __init__(self, root, clock=time.time):
+        self.root = root
+        self.clock = clock
+        os.makedirs(root, exist_ok=True)
+        manifest = read_manifest(root) or {}
+        self.generation = manifest.get('generation', 0)
+        self.entries = dict(manifest.get('tickers', {}))
+        self._published = {}
+        self._retired = []
+
+    def publish(self, snapshots, error=None):
+        retired = []
+        for ticker, snapshot in snapshots.items():
+            if self._published.get(ticker) is snapshot:
+                continue
+            previous = self.entries.get(ticker)
+            version = previous['version'] + 1 if previous else 1
+            # The pid keeps two publishers from ever writing the same file
+            safe = ticker.replace(os.sep, '_').replace('/', '_')
+            name = f"{safe}.{version}.{os.getpid()}.npy"
+            packed, levels = pack_pyramid(snapshot.pyramid)
+            _replace(os.path.join(self.root, name), lambda f: np.save(f, packed))
+            self.entries[ticker] = {
+                'version': version,
+                'refreshed_at': snapshot.refreshed_at,
+                'file': name,
+                'origin_month': snapshot.pyramid.origin_month,
+                'levels': levels,
+            }
+            self._published[ticker] = snapshot
+            if previous:
+                retired.append(previous['file'])
+
+        self.generation += 1
+        manifest = {'generation': self.generation, 'published_at': self.clock(), 'last_error': error,
+                    'tickers': self.entries}
+        _replace(os.path.join(self.root, MANIFEST), lambda f: json.dump(manifest, f), mode='w')
+
+        for name in self._retired:
+            try:
+                os.remove(os.path.join(self.root, name))
+            except OSError:  # already gone, or still mapped on Windows
+                pass
+        self._retired = retired
+
+
+# Read side of the shared directory, with the same interface as
+# BackgroundRefresher. Every worker process maps the published files
+# read-only, so all sessions share one copy of the bars in the page cache
+# and a read only stats the manifest. The first process to take the
+# publisher lock starts the one refresher via `start_refresher(publisher)`.
+class SharedSnapshots:
+    def __init__(self, root, start_refresher=None, sleep=time.sleep):
+        self.root = root
+        self.start_refresher = start_refresher
+        self.sleep = sleep
+        self.refresher = None
+        self.reads = 0
+        self.attaches = 0
+        self._tracked = []
+        self._manifest = {}
+        self._stamp = None
+        self._snapshots = MappingProxyType({})
+        self._lock = threading.Lock()
+        self._lock_file = None
+        os.makedirs(root, exist_ok=True)
+
+    # Become the publisher if no other process is; True while this one is
+    def lead(self, block=False):
+        with self._lock:
+            if self.refresher is None and self.start_refresher is not None and self._acquire(block):
+                self.refresher = self.start_refresher(SnapshotPublisher(self.root))
+                self.refresher.track(self._tracked)
+        return self.refresher is not None
+
+    def _acquire(self, block):
+        if fcntl is None:
+            return True
+        lock_file = open(os.path.join(self.root, LOCK), 'a')
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX if block else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            return False
+        self._lock_file = lock_file  # held until the process exits
+        return True
+
+    # Track tickers; a worker takes over publishing if the publisher is gone
+    def track(self, tickers):
+        with self._lock:
+            self._tracked.extend(ticker for ticker in tickers if ticker not in self._tracked)
+        if self.lead():
+            self.refresher.track(tickers)
+
+    # Map the files of a newer manifest; unchanged tickers keep their views
+    def _reload(self):
+        try:
+            stat = os.stat(os.path.join(self.root, MANIFEST))
+        except FileNotFoundError:
+            return
+        stamp = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if stamp == self._stamp:
+            return
+        with self._lock:
+            if stamp == self._stamp:
+                return
+            manifest = read_manifest(self.root)
+            snapshots = dict(self._snapshots)
+            try:
+                for ticker, entry in manifest['tickers'].items():
+                    current = snapshots.get(ticker)
+                    if current is None or current.version != entry['version']:
+                        snapshots[ticker] = self._attach(ticker, entry)
+            except FileNotFoundError:
+                return  # superseded while attaching; the next read retries
+            self._snapshots = MappingProxyType(snapshots)
+            self._manifest = manifest
+            self._stamp = stamp
+
+    def _attach(self, ticker, entry):
+        packed = np.load(os.path.join(self.root, entry['file']), mmap_mode='r')
+        frames = {freq: unpack_frame(packed, *span) for freq, span in entry['levels'].items()}
+        daily = frames.pop('D')
+        pyramid = OHLCVPyramid.from_levels(daily, frames, entry['origin_month'])
+        self.attaches += 1
+        return Snapshot(ticker, entry['version'], entry['refreshed_at'], daily, pyramid)
+
+    @property
+    def last_error(self):
+        if self.refresher is not None:
+            return self.refresher.last_error
+        self._reload()
+        return self._manifest.get('last_error')
+
+    # Block until every tracked ticker is published or the publisher reports
+    # an error
+    def wait_ready(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            if self.refresher is not None:
+                self.refresher.wait_ready(timeout)
+            self._reload()
+            if all(ticker in self._snapshots for ticker in self._tracked) or self.last_error:
+                return True
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            self.sleep(0.1)
+
+    def snapshot(self, ticker):
+        self._reload()
+        self.reads += 1
+        return self._snapshots.get(ticker)
+
+    def snapshots(self, tickers):
+        self._reload()
+        snapshots = self._snapshots
+        self.reads += len(tickers)
+        return {ticker: snapshots.get(ticker) for ticker in tickers}
+
+    def stats(self):
+        published = self._manifest.get('published_at')
+        return {
+            'shared_dir': self.root,
+            'leader': self.refresher is not None,
+            'generation': self._manifest.get('generation', 0),
+            'published': len(self._snapshots),
+            'attaches': self.attaches,
+            'reads': self.reads,
+            'last_publish': pd.Timestamp(published, unit='s').strftime('%Y-%m-%d %H:%M:%S') if published else None,
+            'last_error': self.last_error,
+            **({'refresher': self.refresher.stats()} if self.refresher is not None else {}),
+        }
+
+
+# Run the publisher on its own, so no dashboard worker has to refresh
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Publish shared market snapshots for dashboard workers.")
+    parser.add_argument("tickers", nargs="*", default=["^GSPC", "^NDX"], help="Tickers to keep fresh")
+    parser.add_argument("--shared-dir", default=os.environ.get("FIB_SHARED_DIR", "shared"),
+                        help="Directory the workers read snapshots from")
+    parser.add_argument("--store", default=os.environ.get("FIB_DATA_DIR", "data"), help="Local bar store directory")
+    parser.add_argument("--start", default="2008-01-01", help="First date of history to keep (YYYY-MM-DD)")
+    parser.add_argument("--interval", type=int, default=300, help="Seconds between refreshes")
+    args = parser.parse_args(argv)
+
+    cache = MarketCache(OHLCVStore(args.store), ThrottledProvider(YFinanceProvider(timeout=30)),
+                        datetime.fromisoformat(args.start))
+    shared = SharedSnapshots(args.shared_dir, lambda publisher: BackgroundRefresher(
+        cache, args.tickers, interval=args.interval, publisher=publisher).start())
+    print(f"Waiting for the publisher lock in {args.shared_dir}", file=sys.stderr)
+    shared.lead(block=True)
+    print(f"Publishing {len(args.tickers)} tickers every {args.interval} seconds", file=sys.stderr)
+    try:
+        while True:
+            time.sleep(args.interval)
+            print(json.dumps(shared.refresher.stats()), file=sys.stderr)
+    except KeyboardInterrupt:
+        shared.refresher.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import numpy as np
+
+SWING_HIGH = 1
+SWING_LOW = -1
+
+
+# Percent-threshold ZigZag fed one bar at a time. A swing high is confirmed
+# once price falls `threshold` below it, a swing low once price rises
+# `threshold` above it.
+class ZigZag:
+    __slots__ = ('threshold', 'trend', 'position', 'ext_pos', 'ext_price',
+                 'high_pos', 'high_price', 'low_pos', 'low_price')
+
+    def __init__(self, threshold=0.05):
+        self.threshold = threshold
+        self.trend = 0  # 1 rising, -1 falling, 0 not yet known
+        self.position = -1
+        self.ext_pos = self.ext_price = None
+        self.high_pos = self.high_price = None
+        self.low_pos = self.low_price = None
+
+    # Returns (position, price, kind) when this bar confirms a pivot, else None
+    def update(self, high, low):
+        self.position += 1
+        i = self.position
+
+        if self.trend == 1:
+            if high > self.ext_price:
+                self.ext_pos, self.ext_price = i, high
+            elif low <= self.ext_price * (1 - self.threshold):
+                pivot = (self.ext_pos, self.ext_price, SWING_HIGH)
+                self.trend, self.ext_pos, self.ext_price = -1, i, low
+                return pivot
+            return None
+
+        if self.trend == -1:
+            if low < self.ext_price:
+                self.ext_pos, self.ext_price = i, low
+            elif high >= self.ext_price * (1 + self.threshold):
+                pivot = (self.ext_pos, self.ext_price, SWING_LOW)
+                self.trend, self.ext_pos, self.ext_price = 1, i, high
+                return pivot
+            return None
+
+        # No direction yet: track both extremes until one move is large enough
+        if self.high_price is None or high > self.high_price:
+            self.high_pos, self.high_price = i, high
+        if self.low_price is None or low < self.low_price:
+            self.low_pos, self.low_price = i, low
+        if self.high_price >= self.low_price * (1 + self.threshold):
+            if self.high_pos > self.low_pos:
+                self.trend, self.ext_pos, self.ext_price = 1, self.high_pos, self.high_price
+                return (self.low_pos, self.low_price, SWING_LOW)
+            self.trend, self.ext_pos, self.ext_price = -1, self.low_pos, self.low_price
+            return (self.high_pos, self.high_price, SWING_HIGH)
+        return None
+
+
+# All confirmed swing points in one linear pass over the bars.
+# Returns (positions, prices, kinds) arrays in bar order.
+def find_swings(high, low, threshold=0.05):
+    zigzag = ZigZag(threshold)
+    update = zigzag.update
+    pivots = [pivot for pivot in map(update, np.asarray(high, dtype='float64').tolist(),
+                                     np.asarray(low, dtype='float64').tolist())
+              if pivot is not None]
+    if not pivots:
+        return np.empty(0, dtype=np.int64), np.empty(0), np.empty(0, dtype=np.int8)
+    positions, prices, kinds = zip(*pivots)
+    return np.array(positions), np.array(prices), np.array(kinds, dtype=np.int8)
+
+
+# Most recent confirmed swing high and swing low prices, or None if the
+# bars never moved by `threshold`
+def last_swing_anchors(data, threshold=0.05):
+    _, prices, kinds = find_swings(data['High'], data['Low'], threshold)
+    highs = prices[kinds == SWING_HIGH]
+    lows = prices[kinds == SWING_LOW]
+    if len(highs) == 0 or len(lows) == 0:
+        return None
+    return highs[-1], lows[-1]
@@ -0,0 +1,40 @@
+import numpy as np
+from ai_cache import ResponseCache, cache_key, market_fingerprint
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_key_ignores_formatting_noise():
+    levels = {'0%': np.float64(4800.123456), '50%': 4500.0}
+    fingerprint = market_fingerprint(4700.0, 1.5, levels)
+    assert fingerprint == market_fingerprint(4700.001, 1.5, {'0%': 4800.12, '50%': 4500})
+    assert fingerprint != market_fingerprint(4710.0, 1.5, levels)
+    assert cache_key("What is  the trend?", fingerprint) == cache_key("what is the trend", fingerprint)
+    # A different prompt context (e.g. a smaller budget) is a different question
+    assert cache_key("trend?", fingerprint, "levels") != cache_key("trend?", fingerprint, "levels\nprices")
+
+
+def test_lru_ttl_and_stats():
+    clock = FakeClock()
+    cache = ResponseCache(max_entries=2, ttl=60, clock=clock)
+    cache.put('a', 'answer a')
+    cache.put('b', 'answer b')
+    assert cache.get('a') == 'answer a'
+    cache.put('c', 'answer c')  # evicts b, the least recently used
+    assert cache.get('b') is None
+
+    clock.now += 61
+    assert cache.get('a') is None
+    assert cache.stats() == {'entries': 1, 'hits': 1, 'misses': 2, 'evictions': 2, 'hit_rate': 1 / 3}
+
+
+def test_sqlite_persistence(tmp_path):
+    path = str(tmp_path / 'answers.db')
+    ResponseCache(path=path).put('k', 'persisted answer')
+    assert ResponseCache(path=path).get('k') == 'persisted answer'
@@ -0,0 +1,87 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from openai import OpenAI
+from ai_client import ChatCompletionError, build_messages, stream_chat_completion, stream_openai_client
+
+TOKENS = ["Support ", "holds ", "at 61.8% ", "— watch 4,200."]
+
+
+# Local stand-in for the chat-completions endpoint that streams TOKENS as SSE
+class MockChatHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    requests_seen = []
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.requests_seen.append((self.path, self.headers.get("Authorization"), body))
+        if self.headers.get("Authorization") != "Bearer test-key":
+            error = b'{"error": "bad key"}'
+            self.send_response(401)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(error)))
+            self.end_headers()
+            self.wfile.write(error)
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for i, token in enumerate(TOKENS + [None]):
+            if token is None:
+                event = "data: [DONE]\n\n"
+            else:
+                chunk = {"id": "c1", "object": "chat.completion.chunk", "created": 0, "model": body["model"],
+                         "choices": [{"index": 0, "delta": {"content": token}, "finish_reason": None}]}
+                event = f"data: {json.dumps(chunk)}\n\n"
+            data = event.encode("utf-8")
+            self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+            self.wfile.flush()
+        self.wfile.write(b"0\r\n\r\n")
+
+    def log_message(self, *args):
+        pass
+
+
+def start_mock_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MockChatHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}/v1"
+
+
+@pytest.fixture
+def mock_server():
+    server, base_url = start_mock_server()
+    MockChatHandler.requests_seen = []
+    yield base_url
+    server.shutdown()
+
+
+def test_streams_tokens_from_local_server(mock_server):
+    messages = build_messages("SPX 0%: 4800", "Where is support?")
+    tokens = list(stream_chat_completion("test-key", messages, base_url=mock_server, timeout=5))
+    assert tokens == TOKENS
+
+    (path, auth, body), = MockChatHandler.requests_seen
+    assert path == "/v1/chat/completions" and body["stream"] is True
+    assert body["messages"][1]["content"].endswith("Question: Where is support?")
+
+
+def test_error_status_and_cancellation(mock_server):
+    with pytest.raises(ChatCompletionError) as error:
+        list(stream_chat_completion("wrong", [], base_url=mock_server, timeout=5))
+    assert error.value.status_code == 401
+
+    cancel_event = threading.Event()
+    tokens = []
+    for token in stream_chat_completion("test-key", [], base_url=mock_server, timeout=5, cancel_event=cancel_event):
+        tokens.append(token)
+        cancel_event.set()
+    assert tokens == TOKENS[:1]
+
+
+def test_openai_sdk_stream(mock_server):
+    client = OpenAI(api_key="test-key", base_url=mock_server)
+    assert list(stream_openai_client(client, build_messages("", "hi"), timeout=5)) == TOKENS
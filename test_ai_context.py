@@ -0,0 +1,35 @@
+import numpy as np
+from ai_context import ContextBuilder, estimate_tokens
+from fib import calculate_fibonacci_levels
+from test_data_store import make_bars
+
+
+def make_builder(budget):
+    bars = make_bars(periods=200)
+    levels = {'Down': calculate_fibonacci_levels(bars, 'down'), 'Up': calculate_fibonacci_levels(bars, 'up')}
+    builder = ContextBuilder(token_budget=budget)
+    builder.add_fibonacci("SPX Fibonacci", levels, priority=1)
+    builder.add("Market", ['Index', 'Price', 'Change%'], [['SPX', np.float64(4712.3456789), 12.5]], priority=0)
+    return builder, levels
+
+
+def test_compact_deterministic_table():
+    context, report = make_builder(400)[0].build()
+    assert context == make_builder(400)[0].build()[0]
+    assert context.startswith("Market\nIndex|Price|Change%\nSPX|4712.35|12.50\n\nSPX Fibonacci\nDir|0%|23.6%")
+    assert report['included'] == ['Market', 'SPX Fibonacci'] and report['dropped'] == []
+    assert report['tokens'] == estimate_tokens(context) <= 400
+
+    # Far smaller than the raw dict reprs the prompt used to embed
+    levels = make_builder(400)[1]
+    fib_only, _ = ContextBuilder().add_fibonacci("SPX Fibonacci", levels).build()
+    raw = f"{levels['Down']}\n{levels['Up']}"
+    assert len(fib_only) < len(raw) * 0.6
+    assert estimate_tokens(fib_only) < estimate_tokens(raw) * 0.6
+
+
+def test_budget_drops_low_priority_sections():
+    context, report = make_builder(30)[0].build()
+    assert report['included'] == ['Market']
+    assert report['dropped'] == ['SPX Fibonacci']
+    assert report['tokens'] <= 30
@@ -0,0 +1,56 @@
+import numpy as np
+from backtest import backtest, level_statistics
+from fib import calculate_fibonacci_levels
+from test_data_store import make_bars
+
+
+# Bar-by-bar reference for level_statistics, using the dict-based levels
+def reference_statistics(bars, window, direction, horizon):
+    touches = np.zeros(7)
+    breaks = np.zeros(7)
+    bounces = np.zeros(7)
+    close = bars['Close'].to_numpy()
+    for t in range(window, len(bars) - horizon):
+        history = bars.iloc[t - window:t]
+        levels = calculate_fibonacci_levels(history, direction)
+        for r, level in enumerate(levels.values()):
+            side = np.sign(close[t - 1] - level)
+            if side == 0 or not bars['Low'].iloc[t] <= level <= bars['High'].iloc[t]:
+                continue
+            touches[r] += 1
+            if side * (close[t] - level) < 0:
+                breaks[r] += 1
+            elif side * (close[t + horizon] - level) > 0:
+                bounces[r] += 1
+    return touches, breaks, bounces
+
+
+def test_level_statistics_match_reference():
+    bars = make_bars(periods=120)
+    bars['High'] = bars['Close'] + np.random.default_rng(1).uniform(0.5, 3, 120)
+    bars['Low'] = bars['Close'] - np.random.default_rng(2).uniform(0.5, 3, 120)
+    ohlc = bars[['Open', 'High', 'Low', 'Close']].to_numpy()
+
+    for direction in ['down', 'up']:
+        stats = level_statistics(ohlc, windows=(20,), direction=direction, horizon=3)
+        touches, breaks, bounces = reference_statistics(bars, 20, direction, 3)
+        assert stats['touches'][0].sum() > 0
+        np.testing.assert_array_equal(stats['touches'][0], touches)
+        np.testing.assert_array_equal(stats['breaks'][0], breaks)
+        np.testing.assert_array_equal(stats['bounces'][0], bounces)
+
+
+def test_parallel_backtest_matches_serial(tmp_path):
+    for seed, ticker in enumerate(['AAPL', 'MSFT', 'NVDA']):
+        bars = make_bars(periods=400)
+        bars[['Open', 'High', 'Low', 'Close']] *= 1 + 0.1 * seed
+        bars.to_csv(tmp_path / f'{ticker}.csv')
+
+    serial, found = backtest(['AAPL', 'MSFT', 'NVDA', 'NOPE'], 'fixtures', str(tmp_path),
+                             windows=(20, 60), workers=1)
+    parallel, _ = backtest(['AAPL', 'MSFT', 'NVDA', 'NOPE'], 'fixtures', str(tmp_path),
+                           windows=(20, 60), workers=2)
+    assert found == 3
+    assert len(serial) == 2 * 2 * 7
+    assert serial.equals(parallel)
+    assert (serial['Touches'] <= serial['Bars']).all()
@@ -0,0 +1,33 @@
+from benchmarks.fixtures import load_bars, yahoo_download
+from benchmarks.run import CASES, compare, run
+from benchmarks.startup import measure_app, publish_fixtures
+from providers import split_ohlcv
+
+
+def test_fixtures_match_provider_output():
+    frames = {ticker: load_bars(ticker, 252) for ticker in ['^GSPC', '^NDX']}
+    assert all(len(frame) == 252 for frame in frames.values())
+    split = split_ohlcv(yahoo_download(frames), list(frames))
+    for ticker, frame in frames.items():
+        assert (split[ticker].to_numpy() == frame.to_numpy()).all()
+
+
+def test_run_records_every_case_and_flags_regressions():
+    results = run(sizes=['1mo'], repeat=1, min_time=0)
+    assert [r['case'] for r in results['results']] == list(CASES)
+    assert all(r['min'] > 0 for r in results['results'])
+
+    slower = {'results': [dict(r, min=r['min'] * 2) for r in results['results']]}
+    assert len(compare(results, slower)) == len(CASES)
+    assert compare(slower, results) == []
+
+
+def test_app_paints_without_loading_deferred_modules(tmp_path):
+    shared_dir = str(tmp_path / "shared")
+    lock_file = publish_fixtures(shared_dir, bars=252)
+    try:
+        result = measure_app('app.py', shared_dir, str(tmp_path / "data"))
+    finally:
+        lock_file.close()
+    assert result['errors'] == [] and result['loaded'] == []
+    assert 0 < result['first_paint'] < result['full_run']
@@ -0,0 +1,38 @@
+import numpy as np
+from charts import create_price_chart, decimate_ohlc, minmax_indices
+from fib import RATIO_SETS, calculate_fibonacci_levels
+from test_data_store import make_bars
+
+
+def test_decimation_keeps_extremes():
+    bars = make_bars('2004-01-01', 5000)
+    candles = decimate_ohlc(bars, 500)
+    assert len(candles) == 500
+    assert candles['High'].max() == bars['High'].max()
+    assert candles['Low'].min() == bars['Low'].min()
+    assert candles['Close'].iloc[-1] == bars['Close'].iloc[-1]
+
+    closes = bars['Close'].to_numpy()
+    keep = minmax_indices(closes, 400)
+    assert len(keep) <= 400 and np.all(np.diff(keep) > 0)
+    assert closes.argmax() in keep and closes.argmin() in keep
+
+
+def test_webgl_chart_is_smaller_with_batched_levels():
+    bars = make_bars('2004-01-01', 5000)
+    down = calculate_fibonacci_levels(bars, 'down')
+    up = calculate_fibonacci_levels(bars, 'up')
+
+    # Candles are never decimated: a daily chart keeps one candle per day
+    full = create_price_chart(bars, down, up, 'Full', max_points=1000)
+    assert len(full.data[0].x) == len(bars)
+    light = create_price_chart(bars, down, up, 'Light', mode='webgl', max_points=1000)
+
+    assert len(light.layout.shapes) == len(full.layout.shapes) == 12
+    assert [trace.type for trace in light.data] == ['scattergl'] * 3
+    assert len(light.to_json()) < len(full.to_json()) / 3
+
+    # With extensions every level is drawn, including 100%
+    extended = calculate_fibonacci_levels(bars, 'down', ratios=RATIO_SETS['Retracements + Extensions'])
+    chart = create_price_chart(bars, extended, extended, 'Extended', mode='webgl', max_points=1000)
+    assert len(chart.layout.shapes) == 20
@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+from charts import create_price_chart
+from compact import CompactUniverse
+from data_store import OHLCVStore
+from fib import calculate_fibonacci_levels
+from indicators import calculate_rsi
+from test_data_store import make_bars
+
+
+def make_universe():
+    frames = {'^GSPC': make_bars('2020-01-01', 300) * 30, '^NDX': make_bars('2020-03-02', 250) * 40}
+    return frames, CompactUniverse(frames)
+
+
+def test_handles_are_views_over_one_packed_array():
+    frames, universe = make_universe()
+    assert universe.tickers == ['^GSPC', '^NDX'] and len(universe) == 2
+    assert len(universe.calendar) == 300
+    assert universe.nbytes < 0.65 * sum(frame.memory_usage(index=True).sum() for frame in frames.values())
+
+    ndx = universe['^NDX']
+    assert np.shares_memory(ndx['Close'], universe.bars)
+    assert ndx['Close'].dtype == np.float32 and ndx['Volume'].dtype == np.int64
+    pd.testing.assert_frame_equal(ndx.to_frame(), frames['^NDX'], check_freq=False, rtol=1e-6)
+
+    since = ndx.since('2020-06-01')
+    assert since.index[0] == pd.Timestamp('2020-06-01') and np.shares_memory(since['Low'], universe.bars)
+
+
+def test_fibonacci_rsi_and_charts_accept_compact_bars():
+    frames, universe = make_universe()
+    bars, frame = universe['^GSPC'], frames['^GSPC']
+
+    for direction in ['down', 'up']:
+        for anchor in ['range', 'swing']:
+            compact = calculate_fibonacci_levels(bars, direction, anchor)
+            expected = calculate_fibonacci_levels(frame, direction, anchor)
+            np.testing.assert_allclose(list(compact.values()), list(expected.values()), rtol=1e-6)
+
+    pd.testing.assert_series_equal(calculate_rsi(bars), calculate_rsi(frame['Close']),
+                                   check_freq=False, rtol=1e-4)
+
+    levels = calculate_fibonacci_levels(bars, 'down')
+    # Candles keep every bar; the WebGL view is decimated to the budget
+    candles = create_price_chart(bars, levels, levels, "S&P 500", 'candlestick', max_points=100)
+    assert len(candles.data[0].x) == len(bars)
+    fig = create_price_chart(bars, levels, levels, "S&P 500", 'webgl', max_points=100)
+    assert len(fig.data[0].x) <= 100
+
+
+def test_from_store(tmp_path):
+    store = OHLCVStore(str(tmp_path))
+    store.append('^GSPC', make_bars())
+    universe = CompactUniverse.from_store(store, ['^GSPC'], start='2020-06-01')
+    assert universe['^GSPC'].index[0] == pd.Timestamp('2020-06-01')
@@ -0,0 +1,171 @@
+import numpy as np
+import pandas as pd
+import pytest
+import yfinance
+import yfinance.utils
+from providers import OHLCV_COLUMNS, FakeProvider, ProviderError, YFinanceProvider, split_ohlcv
+from data_store import OHLCVStore
+
+
+# Synthetic daily bars so the store can be checked offline
+def make_bars(start='2020-01-01', periods=300):
+    index = pd.bdate_range(start, periods=periods)
+    close = 100 + np.cumsum(np.random.default_rng(0).normal(0, 1, periods))
+    return pd.DataFrame({
+        'Open': close, 'High': close + 1, 'Low': close - 1, 'Close': close,
+        'Volume': np.full(periods, 1000.0),
+    }, index=index)
+
+
+def test_cold_start_reads_from_disk(tmp_path):
+    bars = make_bars()
+    end = bars.index[-1] + pd.Timedelta(days=1)
+    provider = FakeProvider({'^GSPC': bars})
+
+    first = OHLCVStore(str(tmp_path)).update('^GSPC', provider, bars.index[0], end)
+    assert len(provider.calls) == 1
+    pd.testing.assert_frame_equal(first, bars, check_freq=False)
+
+    # A new store over the same directory makes no provider call
+    second = OHLCVStore(str(tmp_path)).update('^GSPC', provider, bars.index[0], end)
+    assert len(provider.calls) == 1
+    pd.testing.assert_frame_equal(second, bars, check_freq=False)
+
+
+def test_warm_refresh_fetches_only_the_tail(tmp_path):
+    bars = make_bars()
+    store = OHLCVStore(str(tmp_path))
+    store.append('^NDX', bars.iloc[:-5])
+
+    provider = FakeProvider({'^NDX': bars})
+    end = bars.index[-1] + pd.Timedelta(days=1)
+    data = store.update('^NDX', provider, bars.index[0], end)
+
+    (ticker, start, _), = provider.calls
+    assert start == bars.index[-6]
+    assert len(provider.frames[ticker].loc[start:]) == 6
+    pd.testing.assert_frame_equal(data, bars, check_freq=False)
+
+
+def test_earlier_start_fetches_missing_head(tmp_path):
+    bars = make_bars()
+    store = OHLCVStore(str(tmp_path))
+    store.append('^NDX', bars.iloc[100:])
+
+    provider = FakeProvider({'^NDX': bars})
+    end = bars.index[-1] + pd.Timedelta(days=1)
+    data = store.update('^NDX', provider, bars.index[0], end)
+
+    # Without a recorded fetch time the last bar may be partial, so it is refetched once
+    assert provider.calls == [('^NDX', bars.index[0], bars.index[100]), ('^NDX', bars.index[-1], end)]
+    assert len(data) == len(bars)
+
+
+def test_holiday_start_is_not_refetched_on_a_warm_store(tmp_path):
+    bars = make_bars('2008-01-02', 300)
+    end = bars.index[-1] + pd.Timedelta(days=1)
+    provider = FakeProvider({'^GSPC': bars, '^NDX': bars})
+    OHLCVStore(str(tmp_path)).update_many(['^GSPC', '^NDX'], provider, '2008-01-01', end)
+
+    # Jan 1 has no bar; once requested it counts as covered
+    provider.calls.clear()
+    store = OHLCVStore(str(tmp_path))
+    for _ in range(3):
+        store.update('^GSPC', provider, '2008-01-01', end)
+        store.update_many(['^GSPC', '^NDX'], provider, '2008-01-01', end)
+    assert provider.calls == []
+    assert store.covered_from('^GSPC') == pd.Timestamp('2008-01-01')
+
+
+# Stand-in for yf.download over an empty range: an empty frame, with the
+# per-ticker error yfinance records in shared._ERRORS
+def fake_download(error):
+    calls = []
+
+    def download(tickers, **kwargs):
+        calls.append((tickers, kwargs['start'], kwargs['end']))
+        yfinance.shared._ERRORS = {ticker: error for ticker in np.atleast_1d(tickers)}
+        return yfinance.utils.empty_df()
+    return download, calls
+
+
+def test_empty_holiday_range_is_not_an_error(tmp_path, monkeypatch):
+    bars = make_bars('2008-01-02', 300)
+    store = OHLCVStore(str(tmp_path))
+    store.append('^GSPC', bars)
+    download, calls = fake_download("No data found for this date range, symbol may be delisted")
+    monkeypatch.setattr(yfinance, 'download', download)
+
+    # A store written before start dates and fetch times were recorded asks
+    # for [Jan 1, Jan 2) and its last bar once
+    end = bars.index[-1] + pd.Timedelta(days=1)
+    for _ in range(2):
+        data = store.update('^GSPC', YFinanceProvider(), '2008-01-01', end)
+        pd.testing.assert_frame_equal(data, bars, check_freq=False)
+    assert [call[1:] for call in calls] == [(pd.Timestamp('2008-01-01'), pd.Timestamp('2008-01-02')),
+                                            (bars.index[-1], end)]
+
+    # Transport and HTTP failures still raise
+    download, _ = fake_download("ReadTimeout('query2.finance.yahoo.com timed out')")
+    monkeypatch.setattr(yfinance, 'download', download)
+    with pytest.raises(ProviderError, match='ReadTimeout'):
+        YFinanceProvider().fetch_many(['^GSPC', '^NDX'], '2024-01-01', '2024-01-05')
+
+
+def test_bar_fetched_mid_session_is_refetched_until_final(tmp_path):
+    bars = make_bars('2024-01-01', 119)  # ends on Thursday 2024-06-13
+    partial = bars.iloc[:-1].copy()
+    partial.iloc[-1, partial.columns.get_loc('Close')] += 5
+
+    # At 10:00 on 06-12 the provider only has a partial bar for that day
+    store = OHLCVStore(str(tmp_path))
+    store.update('^GSPC', FakeProvider({'^GSPC': partial}), bars.index[0], '2024-06-12 10:00')
+
+    provider = FakeProvider({'^GSPC': bars})
+    for now in ['2024-06-12 16:30', '2024-06-13 09:00', '2024-06-13 20:00', '2024-06-14 09:00']:
+        data = store.update_many(['^GSPC'], provider, bars.index[0], now)['^GSPC']
+    assert [call[1:] for call in provider.calls] == [
+        (bars.index[-2], pd.Timestamp('2024-06-12 16:30')),
+        (bars.index[-2], pd.Timestamp('2024-06-13 09:00')),
+        (bars.index[-1], pd.Timestamp('2024-06-13 20:00')),
+        (bars.index[-1], pd.Timestamp('2024-06-14 09:00')),
+    ]
+    pd.testing.assert_frame_equal(data, bars, check_freq=False)
+
+    # Once fetched after its day ended, the last bar is final
+    store.update('^GSPC', provider, bars.index[0], '2024-06-14 12:00')
+    assert len(provider.calls) == 4
+
+
+def test_split_ohlcv_handles_grouped_download():
+    spx, ndx = make_bars(), make_bars().iloc[:-3] * 2
+    grouped = pd.concat({'^GSPC': spx, '^NDX': ndx}, axis=1).swaplevel(axis=1)
+    grouped['Adj Close', '^GSPC'] = spx['Close']
+
+    frames = split_ohlcv(grouped, ['^GSPC', '^NDX', '^DJI'])
+    pd.testing.assert_frame_equal(frames['^GSPC'], spx, check_freq=False)
+    pd.testing.assert_frame_equal(frames['^NDX'], ndx, check_freq=False)
+    assert frames['^DJI'].empty
+
+    # Each ticker is backed by one contiguous float64 block, not per-column copies
+    values = frames['^NDX'].to_numpy()
+    assert values.dtype == np.float64 and values.T.flags['C_CONTIGUOUS']
+    assert all(np.shares_memory(frames['^NDX'][column].to_numpy(), values) for column in OHLCV_COLUMNS)
+
+
+def test_update_many_batches_cold_and_tail_requests(tmp_path):
+    bars = make_bars()
+    store = OHLCVStore(str(tmp_path))
+    store.append('^GSPC', bars.iloc[:-2])
+    store.append('^NDX', bars.iloc[:-4])
+
+    provider = FakeProvider({'^GSPC': bars, '^NDX': bars, '^DJI': bars})
+    end = bars.index[-1] + pd.Timedelta(days=1)
+    data = store.update_many(['^GSPC', '^NDX', '^DJI'], provider, bars.index[0], end)
+
+    assert provider.calls == [
+        (('^DJI',), bars.index[0], end),
+        (('^GSPC', '^NDX'), bars.index[-5], end),
+    ]
+    for frame in data.values():
+        pd.testing.assert_frame_equal(frame, bars, check_freq=False)
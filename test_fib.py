@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+from fib import (FIB_LABELS, RATIO_SETS, FibonacciGrid, calculate_fibonacci_levels, levels_to_dict,
+                 rolling_fibonacci_levels, rolling_max, rolling_min)
+from test_data_store import make_bars
+
+
+# Reference levels for one window, written like the app's original function
+def reference_levels(data, direction):
+    high = data['High'].max()
+    if direction == 'down':
+        low = data['Low'].min()
+        return [high - r * (high - low) for r in (0, 0.236, 0.382, 0.5, 0.618, 0.786, 1)]
+    latest_low = data['Low'].iloc[-1]
+    return [latest_low + r * (high - latest_low) for r in (0, 0.236, 0.382, 0.5, 0.618, 0.786, 1)]
+
+
+def test_rolling_extremes_match_pandas():
+    values = np.random.default_rng(3).normal(size=257)
+    for window in (1, 5, 16, 257):
+        expected_max = pd.Series(values).rolling(window).max().to_numpy()
+        expected_min = pd.Series(values).rolling(window).min().to_numpy()
+        np.testing.assert_allclose(rolling_max(values, window), expected_max)
+        np.testing.assert_allclose(rolling_min(values, window), expected_min)
+
+
+def test_rolling_levels_match_single_window_calculation():
+    bars = make_bars(periods=120)
+    windows = [10, 60]
+    for direction in ('down', 'up'):
+        levels = rolling_fibonacci_levels(bars, windows, direction)
+        assert levels.shape == (2, 120, len(FIB_LABELS))
+        assert np.isnan(levels[1, 58]).all()
+        for w, window in enumerate(windows):
+            for end in (window - 1, 75, 119):
+                expected = reference_levels(bars.iloc[end - window + 1:end + 1], direction)
+                np.testing.assert_allclose(levels[w, end], expected)
+
+    assert list(levels_to_dict(levels[0, -1])) == FIB_LABELS
+
+
+def test_grid_matches_per_ticker_levels_with_extensions():
+    ratios = RATIO_SETS['Retracements + Extensions']
+    data = {'^GSPC': make_bars(periods=300), '^NDX': make_bars(periods=120) * 3}
+    windows = [20, 250]
+    for direction in ('down', 'up'):
+        grid = FibonacciGrid(data, windows, direction, ratios)
+        assert grid.levels.shape == (2, 2, 10)
+        for ticker, bars in data.items():
+            for window in windows:
+                expected = calculate_fibonacci_levels(bars.iloc[-window:], direction, ratios=ratios)
+                assert grid.to_dict(ticker, window) == expected
+                assert list(expected)[-3:] == ['127.2%', '161.8%', '261.8%']
+
+    table = grid.to_frame()
+    assert len(table) == 2 * 2 * 10
+    row = table[(table['Ticker'] == '^NDX') & (table['Window'] == 250) & (table['Level'] == '100%')]
+    assert row['Price'].item() == data['^NDX']['High'].max()
@@ -0,0 +1,31 @@
+import numpy as np
+from fib import calculate_fibonacci_levels
+from indicators import IncrementalFibonacci, IncrementalRSI, RunningHighLow, calculate_rsi
+from test_data_store import make_bars
+
+
+def test_incremental_rsi_matches_batch():
+    closes = make_bars(periods=400)['Close']
+    for smoothing in ('sma', 'wilder'):
+        expected = calculate_rsi(closes, 14, smoothing)
+        rsi = IncrementalRSI(14, smoothing)
+        streamed = [rsi.update(close) for close in closes]
+        np.testing.assert_allclose(streamed, expected.to_numpy(), rtol=1e-9)
+        assert np.isnan(streamed[12]) and not np.isnan(streamed[13])
+
+
+def test_running_high_low_window():
+    bars = make_bars(periods=200)
+    tracker = RunningHighLow(window=20)
+    for high, low in zip(bars['High'], bars['Low']):
+        current = tracker.update(high, low)
+    assert current == (bars['High'].iloc[-20:].max(), bars['Low'].iloc[-20:].min())
+
+
+def test_incremental_fibonacci_matches_batch():
+    bars = make_bars(periods=150)
+    for direction in ('down', 'up'):
+        fib = IncrementalFibonacci(direction)
+        for high, low in zip(bars['High'], bars['Low']):
+            levels = fib.update(high, low)
+        assert levels == calculate_fibonacci_levels(bars, direction)
@@ -0,0 +1,113 @@
+import numpy as np
+import pandas as pd
+from fib import RATIO_SETS, calculate_fibonacci_levels
+from intraday import IntradayBoard, IntradaySeries, PollingSource, TickReplay
+from providers import FakeProvider, OHLCV_COLUMNS
+
+
+def make_ticks(n=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    times = pd.Timestamp('2024-06-03 09:30') + pd.to_timedelta(np.sort(rng.uniform(0, 3 * 3600, n)), unit='s')
+    frames = []
+    for ticker, base in [('^GSPC', 5300.0), ('^NDX', 18600.0)]:
+        prices = base * np.exp(np.cumsum(rng.normal(0, 0.0003, n)))
+        frames.append(pd.DataFrame({'timestamp': times, 'ticker': ticker, 'price': prices,
+                                    'volume': rng.integers(1, 100, n).astype('float64')}))
+    return pd.concat(frames).sort_values('timestamp', kind='stable').reset_index(drop=True)
+
+
+def resample_ticks(ticks, ticker, freq):
+    prices = ticks[ticks['ticker'] == ticker].set_index('timestamp')
+    bars = prices['price'].resample(freq).ohlc().rename(columns=str.capitalize)
+    bars['Volume'] = prices['volume'].resample(freq).sum()
+    return bars.dropna(subset=['Close'])[OHLCV_COLUMNS]
+
+
+def test_series_revises_forming_bar_and_grows():
+    bars = resample_ticks(make_ticks(), '^GSPC', '1min')
+    series = IntradaySeries('^GSPC', capacity=4)
+
+    # Overlapping polls: each one repeats the previous poll's last bar
+    for start in range(0, len(bars), 10):
+        assert series.append(bars.iloc[max(start - 1, 0):start + 10]) > 0
+    assert len(series) == len(bars) and len(series.times) >= len(bars)
+    pd.testing.assert_frame_equal(series.frame(), bars, check_freq=False, check_names=False)
+
+    for direction in ['down', 'up']:
+        for ratios in RATIO_SETS.values():
+            assert series.levels(direction, ratios) == calculate_fibonacci_levels(bars, direction, ratios=ratios)
+
+    metrics = series.metrics()
+    assert metrics['bars'] == len(bars) and metrics['time'] == bars.index[-1]
+    assert np.isclose(metrics['change'], (bars['Close'].iloc[-1] / bars['Open'].iloc[0] - 1) * 100)
+
+
+def test_revised_bar_only_counts_once_it_completes():
+    bars = resample_ticks(make_ticks(), '^NDX', '5min')
+    series = IntradaySeries('^NDX', window=3)
+    series.append(bars.iloc[:4])
+    assert series.append(bars.iloc[[3]]) == 0
+    forming = bars.iloc[[3]].copy()
+    forming['High'] = bars['High'].max() + 100
+    assert series.append(forming) == 1
+    assert series.range.count == 3 and series.levels('down')['0%'] == forming['High'].iloc[0]
+
+    series.append(bars.iloc[3:5])
+    assert series.levels('down')['0%'] == bars['High'].iloc[2:5].max()
+
+
+def test_only_the_newest_session_counts():
+    monday = resample_ticks(make_ticks(), '^GSPC', '1min')
+    tuesday = resample_ticks(make_ticks(seed=1), '^GSPC', '1min')
+    tuesday.index += pd.Timedelta(days=1)
+    series = IntradaySeries('^GSPC')
+
+    # The first poll reaches back over both sessions; Tuesday's bars arrive in two polls
+    series.append(pd.concat([monday, tuesday.iloc[:50]]))
+    series.append(tuesday.iloc[49:])
+    assert len(series) == len(monday) + len(tuesday)
+    pd.testing.assert_frame_equal(series.frame(), tuesday, check_freq=False, check_names=False)
+
+    for direction in ['down', 'up']:
+        assert series.levels(direction) == calculate_fibonacci_levels(tuesday, direction)
+    metrics = series.metrics()
+    assert metrics['bars'] == len(tuesday)
+    assert np.isclose(metrics['change'], (tuesday['Close'].iloc[-1] / tuesday['Open'].iloc[0] - 1) * 100)
+
+
+def test_tick_replay_matches_resampled_bars():
+    ticks = make_ticks()
+    board = IntradayBoard(['^GSPC', '^NDX'], TickReplay(ticks, '5m', ticks_per_poll=37))
+    while not board.exhausted:
+        board.tick()
+    assert board.ticks == -(-len(ticks) // 37)
+
+    for ticker, series in board.series.items():
+        pd.testing.assert_frame_equal(series.frame(), resample_ticks(ticks, ticker, '5min'),
+                                      check_freq=False, check_names=False)
+
+
+def test_board_only_reports_tickers_that_changed():
+    ticks = make_ticks(50)
+    ticks = ticks[ticks['ticker'] == '^GSPC']
+    board = IntradayBoard(['^GSPC', '^NDX'], TickReplay(ticks, '1m', ticks_per_poll=10))
+    assert board.tick() == ['^GSPC']
+    assert len(board.series['^NDX']) == 0 and board.series['^NDX'].levels() == {}
+    assert board.last_update >= 0 and board.last_poll >= 0
+
+
+def test_polling_source_resumes_from_oldest_latest_bar():
+    bars = resample_ticks(make_ticks(), '^GSPC', '1min')
+    provider = FakeProvider({'^GSPC': bars, '^NDX': bars * 3}, daily=False)
+    now = [bars.index[20]]
+    board = IntradayBoard(['^GSPC', '^NDX'], PollingSource(provider, clock=lambda: now[0]))
+
+    assert board.tick() == ['^GSPC', '^NDX']
+    assert provider.calls[-1][1] == now[0] - pd.Timedelta(days=5)
+    now[0] = bars.index[-1]
+    board.tick()
+    assert provider.calls[-1][1] == bars.index[-1]
+    assert len(board.series['^NDX']) == len(bars)
+
+    # Polling again only repeats the unchanged newest bar
+    assert board.tick() == []
@@ -0,0 +1,44 @@
+import pandas as pd
+from data_store import OHLCVStore
+from market_cache import MarketCache, trading_day
+from resample import resample_ohlcv
+from providers import FakeProvider
+from test_data_store import make_bars
+
+
+def make_cache(tmp_path, bars):
+    provider = FakeProvider({'^GSPC': bars, '^NDX': bars})
+    return MarketCache(OHLCVStore(str(tmp_path)), provider, bars.index[0]), provider
+
+
+def test_start_year_change_only_slices(tmp_path):
+    bars = make_bars('2008-01-01', 2000)
+    cache, provider = make_cache(tmp_path, bars)
+    now = bars.index[-1] + pd.Timedelta(days=1)
+
+    first = cache.resampled_many(['^GSPC', '^NDX'], '2ME', now)
+    second = cache.resampled_many(['^GSPC', '^NDX'], '2ME', now + pd.Timedelta(hours=3))
+
+    assert len(provider.calls) == 1
+    assert second['^GSPC'] is first['^GSPC']
+    assert cache.stats()['resampled'] == {'hits': 2, 'misses': 2, 'hit_rate': 0.5}
+
+    # The window matches resampling the sliced daily bars directly
+    window = cache.window_many(['^GSPC'], '2ME', '2010-01-01', now)['^GSPC']
+    pd.testing.assert_frame_equal(window, resample_ohlcv(bars.loc['2010-01-01':], '2ME'), check_freq=False)
+    assert len(provider.calls) == 1
+
+
+def test_new_trading_day_reloads_raw_bars(tmp_path):
+    bars = make_bars('2020-01-01', 300)
+    cache, provider = make_cache(tmp_path, bars.iloc[:-1])
+    now = bars.index[-2] + pd.Timedelta(days=1)
+    cache.resampled_many(['^GSPC'], 'ME', now)
+
+    provider.frames['^GSPC'] = bars
+    later = bars.index[-1] + pd.Timedelta(days=1)
+    raw = cache.raw_many(['^GSPC'], later)['^GSPC']
+
+    assert len(raw) == len(bars)
+    assert cache.stats()['raw']['misses'] == 2
+    assert trading_day(pd.Timestamp('2024-06-09 15:00')) == pd.Timestamp('2024-06-07')
@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+from range_index import RangeQueryIndex, SparseTable
+from test_data_store import make_bars
+from test_fib import reference_levels
+
+
+def test_sparse_table_matches_brute_force():
+    values = np.random.default_rng(5).integers(0, 20, size=200).astype(float)
+    lo = np.array([0, 3, 17, 50, 199, 0])
+    hi = np.array([199, 3, 90, 51, 199, 130])
+    for op, pick in (('max', np.argmax), ('min', np.argmin)):
+        table = SparseTable(values, op)
+        expected = [a + pick(values[a:b + 1]) for a, b in zip(lo, hi)]
+        np.testing.assert_array_equal(table.argquery(lo, hi), expected)
+
+
+def test_date_window_queries_match_frame_scans():
+    bars = make_bars('2008-01-01', 4000)
+    index = RangeQueryIndex(bars)
+    starts = pd.to_datetime([f'{year}-01-01' for year in range(2008, 2024)])
+    end = bars.index[-1]
+
+    highs = index.high(starts, end)
+    for start, high in zip(starts, highs):
+        assert high == bars.loc[start:, 'High'].max()
+    assert index.idxmin(starts[3], end)[0] == bars.loc[starts[3]:, 'Low'].idxmin()
+
+    for direction in ('down', 'up'):
+        levels = index.fibonacci_levels(starts, end, direction)
+        for start, row in zip(starts, levels):
+            np.testing.assert_allclose(row, reference_levels(bars.loc[start:], direction))
+
+    # A window with no bars yields NaN levels
+    assert np.isnan(index.fibonacci_levels('1990-01-01', '1990-12-31')).all()
+
+
+def test_windows_without_bars_give_nan_and_nat():
+    bars = make_bars('2020-01-01', 50)
+    index = RangeQueryIndex(bars)
+    after = bars.index[-1] + pd.Timedelta(days=30)
+    starts = pd.DatetimeIndex([bars.index[0], after])
+    ends = pd.DatetimeIndex([bars.index[-1], after + pd.Timedelta(days=10)])
+
+    np.testing.assert_array_equal(index.high(starts, ends), [bars['High'].max(), np.nan])
+    assert np.isnan(index.low(after, after)[0])
+    assert index.idxmax(starts, ends)[0] == bars['High'].idxmax() and pd.isna(index.idxmax(starts, ends)[1])
+    assert pd.isna(index.idxmin(after, after)[0])
+
+    empty = RangeQueryIndex(bars.iloc[:0])
+    assert np.isnan(empty.high(starts, ends)).all() and pd.isna(empty.idxmin(starts, ends)).all()
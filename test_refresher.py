@@ -0,0 +1,141 @@
+import threading
+import time
+import pandas as pd
+from data_store import OHLCVStore
+from market_cache import MarketCache
+from providers import FakeProvider
+from refresher import BackgroundRefresher
+from test_data_store import make_bars
+
+
+# Fake provider whose fetches block until released, to simulate slow upstream calls
+class SlowProvider(FakeProvider):
+    def __init__(self, frames):
+        super().__init__(frames)
+        self.release = threading.Event()
+
+    def fetch_many(self, tickers, start, end):
+        self.release.wait(5)
+        return super().fetch_many(tickers, start, end)
+
+
+def test_concurrent_requests_share_one_fetch(tmp_path):
+    bars = make_bars('2020-01-01', 300)
+    provider = SlowProvider({'^GSPC': bars})
+    cache = MarketCache(OHLCVStore(str(tmp_path)), provider, bars.index[0])
+    now = bars.index[-1] + pd.Timedelta(days=1)
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.raw_many(['^GSPC'], now)))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.2)
+    provider.release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(provider.calls) == 1
+    assert len(results) == 8 and all(len(r['^GSPC']) == 300 for r in results)
+
+
+def test_refresher_publishes_snapshots_and_keeps_them_on_failure(tmp_path):
+    bars = make_bars('2020-01-01', 300)
+    provider = FakeProvider({'^GSPC': bars, '^NDX': bars})
+    cache = MarketCache(OHLCVStore(str(tmp_path)), provider, bars.index[0])
+    refresher = BackgroundRefresher(cache, ['^GSPC'])
+    now = bars.index[-1] + pd.Timedelta(days=1)
+
+    assert refresher.refresh(now)
+    first = refresher.snapshot('^GSPC')
+    assert first.version == 1 and len(first.daily) == 300
+    assert refresher.snapshot('^NDX') is None
+
+    # Nothing changed: the same snapshot object stays published
+    assert refresher.refresh(now)
+    assert refresher.snapshot('^GSPC') is first
+
+    def fail(*args):
+        raise ConnectionError("upstream down")
+    provider.fetch_many = fail
+    refresher.track(['^NDX'])
+    assert not refresher.refresh(now)
+    assert refresher.snapshot('^GSPC') is first
+    assert refresher.stats()['last_error'] == "^NDX: ConnectionError: upstream down"
+
+
+def test_background_thread_refreshes_once_started(tmp_path):
+    bars = make_bars('2020-01-01', 50)
+    cache = MarketCache(OHLCVStore(str(tmp_path)), FakeProvider({'^NDX': bars}), bars.index[0])
+    refresher = BackgroundRefresher(cache, ['^NDX'], interval=60).start()
+    try:
+        assert refresher.wait_ready(5)
+        assert refresher.snapshot('^NDX') is not None
+    finally:
+        refresher.stop()
+
+
+# Fake provider that fails any request including `bad`
+class BadTickerProvider(FakeProvider):
+    def __init__(self, frames, bad):
+        super().__init__(frames)
+        self.bad = bad
+
+    def fetch_many(self, tickers, start, end):
+        if self.bad in tickers:
+            raise ValueError(f"unknown symbol {self.bad}")
+        return super().fetch_many(tickers, start, end)
+
+
+def test_one_failing_ticker_does_not_block_the_others(tmp_path):
+    bars = make_bars('2020-01-01', 300)
+    provider = BadTickerProvider({'^GSPC': bars, '^NDX': bars}, bad='^BAD')
+    cache = MarketCache(OHLCVStore(str(tmp_path)), provider, bars.index[0])
+    refresher = BackgroundRefresher(cache, ['^GSPC', '^BAD', '^NDX'])
+
+    assert not refresher.refresh(bars.index[-1] + pd.Timedelta(days=1))
+    assert refresher.snapshot('^GSPC') is not None and refresher.snapshot('^NDX') is not None
+    assert refresher.snapshot('^BAD') is None
+    assert refresher.last_error == "^BAD: ValueError: unknown symbol ^BAD"
+    assert refresher.wait_ready(timeout=0)
+
+
+def test_later_refresh_on_the_same_day_publishes_the_new_close(tmp_path):
+    bars = make_bars('2020-01-01', 300)
+    day = bars.index[-1]
+    forming = bars.copy()
+    forming.iloc[-1, forming.columns.get_loc('Close')] -= 3
+    provider = FakeProvider({'^GSPC': forming})
+    cache = MarketCache(OHLCVStore(str(tmp_path)), provider, bars.index[0])
+    refresher = BackgroundRefresher(cache, ['^GSPC'])
+
+    assert refresher.refresh(day + pd.Timedelta(hours=11))
+    assert refresher.snapshot('^GSPC').daily['Close'].iloc[-1] == forming['Close'].iloc[-1]
+
+    # Pages still get the trading-day cache; the refresher checks the tail
+    provider.frames = FakeProvider({'^GSPC': bars}).frames
+    later = day + pd.Timedelta(hours=17)
+    assert cache.raw_many(['^GSPC'], later)['^GSPC']['Close'].iloc[-1] == forming['Close'].iloc[-1]
+    assert refresher.refresh(later)
+    snapshot = refresher.snapshot('^GSPC')
+    assert snapshot.version == 2 and snapshot.daily['Close'].iloc[-1] == bars['Close'].iloc[-1]
+
+
+def test_ticker_tracked_during_a_refresh_is_waited_for(tmp_path):
+    bars = make_bars('2020-01-01', 50)
+    cache = MarketCache(OHLCVStore(str(tmp_path)), FakeProvider({'^GSPC': bars, '^NDX': bars}), bars.index[0])
+    refresher = BackgroundRefresher(cache, ['^GSPC'])
+    now = bars.index[-1] + pd.Timedelta(days=1)
+
+    # ^NDX is tracked after the refresh took its ticker list
+    pyramids_many = cache.pyramids_many
+    def track_midway(tickers, now=None, force=False):
+        refresher.track(['^NDX'])
+        return pyramids_many(tickers, now, force)
+    cache.pyramids_many = track_midway
+    refresher.refresh(now)
+    assert not refresher.wait_ready(timeout=0)
+
+    cache.pyramids_many = pyramids_many
+    refresher.refresh(now)
+    assert refresher.wait_ready(timeout=0) and refresher.snapshot('^NDX') is not None
@@ -0,0 +1,27 @@
+import io
+import pandas as pd
+from indicators import calculate_rsi
+from report import REPORT_HEADER, render_report, write_report
+from test_data_store import make_bars
+
+
+# The row format of the original iterrows() loop
+def reference_rows(hist, rsi):
+    rows = []
+    for date, row in hist.iterrows():
+        rsi_value = rsi[date] if not pd.isna(rsi[date]) else "N/A"
+        rows.append(f"{date.strftime('%Y-%m-%d')} | {row['Close']:11.2f} | {rsi_value if isinstance(rsi_value, str) else f'{rsi_value:.2f}'}")
+    return rows
+
+
+def test_report_matches_row_by_row_formatting():
+    hist = make_bars(periods=300)
+    hist.index = hist.index.tz_localize('America/New_York')
+    rsi = calculate_rsi(hist['Close'])
+    expected = REPORT_HEADER + reference_rows(hist, rsi)
+
+    assert render_report(hist, rsi).split('\n') == expected
+
+    out = io.StringIO()
+    write_report(hist, rsi, out, chunk_size=64)
+    assert out.getvalue() == '\n'.join(expected) + '\n'
@@ -0,0 +1,39 @@
+import pandas as pd
+from resample import OHLCVPyramid, resample_ohlcv
+from test_data_store import make_bars
+
+
+def assert_levels_match_pandas(pyramid, daily):
+    for freq in ('W', 'ME', '2ME'):
+        pd.testing.assert_frame_equal(pyramid.level(freq), resample_ohlcv(daily, freq), check_freq=False)
+
+
+def test_pyramid_matches_pandas_resample():
+    for start in ('2008-01-01', '2009-02-17'):
+        daily = make_bars(start, 900)
+        assert_levels_match_pandas(OHLCVPyramid(daily), daily)
+
+
+def test_incremental_update_matches_full_rebuild():
+    daily = make_bars('2008-01-01', 900)
+    pyramid = OHLCVPyramid(daily.iloc[:850])
+
+    # A revised last bar plus new bars spanning a bucket boundary
+    revised = daily.iloc[849:870].copy()
+    revised.iloc[0, revised.columns.get_loc('High')] += 50
+    copy = pyramid.copy()
+    copy.update(revised)
+    expected = pd.concat([daily.iloc[:849], revised])
+    assert_levels_match_pandas(copy, expected)
+
+    # The original pyramid is untouched
+    assert_levels_match_pandas(pyramid, daily.iloc[:850])
+
+
+def test_window_matches_resampling_the_slice():
+    daily = make_bars('2008-01-01', 900)
+    pyramid = OHLCVPyramid(daily)
+    for freq in ('W', 'ME', '2ME'):
+        window = pyramid.window(freq, '2009-01-01')
+        pd.testing.assert_frame_equal(window, resample_ohlcv(daily.loc['2009-01-01':], freq), check_freq=False)
+    assert pyramid.window('D', '2009-01-01').index[0] == daily.loc['2009-01-01':].index[0]
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+from data_store import OHLCVStore
+from providers import FakeProvider
+from fib import calculate_fibonacci_levels
+from scan import main, parse_start_years, scan, sweep, update_store
+from throttle import ThrottledProvider
+from test_data_store import make_bars
+
+
+def test_scan_fixture_directory(tmp_path):
+    bars = make_bars(periods=100)
+    bars.to_csv(tmp_path / 'AAPL.csv')
+    bars.to_csv(tmp_path / 'MSFT.csv')
+
+    results = scan(['AAPL', 'MSFT', 'NOPE'], 'fixtures', str(tmp_path), workers=2)
+    assert results['Ticker'].tolist() == ['AAPL', 'MSFT', 'NOPE']
+    assert results.loc[0, 'Bars'] == 100
+    assert results.loc[0, 'Down 0%'] == bars['High'].max()
+    assert pd.isna(results.loc[2, 'Close'])
+
+
+def test_cli_reads_store_and_writes_csv(tmp_path):
+    store_dir, output = tmp_path / 'store', tmp_path / 'out.csv'
+    OHLCVStore(str(store_dir)).append('^NDX', make_bars(periods=50))
+    tickers_file = tmp_path / 'tickers.txt'
+    tickers_file.write_text('# index\n^NDX\n\n')
+
+    main(['--tickers-file', str(tickers_file), '--store', str(store_dir),
+          '--workers', '1', '--output', str(output)])
+    results = pd.read_csv(output)
+    assert results['Ticker'].tolist() == ['^NDX']
+    assert results.loc[0, 'Bars'] == 50
+
+
+def test_start_year_sweep_matches_per_window_levels(tmp_path):
+    bars = make_bars('2008-01-01', 1000)
+    bars.to_csv(tmp_path / 'AAPL.csv')
+
+    starts = parse_start_years('2008:2012')
+    results = sweep(['AAPL', 'NOPE'], 'fixtures', str(tmp_path), starts, workers=1)
+    assert results['Start'].iloc[:5].tolist() == [f'{year}-01-01' for year in range(2008, 2013)]
+    for (_, row), start in zip(results.iloc[:4].iterrows(), starts):
+        window = bars.loc[start:]
+        assert row['Bars'] == len(window) and row['High Date'] == window['High'].idxmax().strftime('%Y-%m-%d')
+        for direction in ('down', 'up'):
+            for label, value in calculate_fibonacci_levels(window, direction).items():
+                assert np.isclose(row[f"{direction.capitalize()} {label}"], value)
+
+    # 2012 starts after the last bar; a ticker without bars gets one empty row
+    assert results.loc[4, 'Bars'] == 0 and pd.isna(results.loc[4, 'Down 0%'])
+    assert results.loc[5, 'Ticker'] == 'NOPE' and pd.isna(results.loc[5, 'Bars'])
+
+
+def test_update_store_batches_requests(tmp_path):
+    bars = make_bars('2020-01-01', 30)
+    provider = FakeProvider({ticker: bars for ticker in ['A', 'B', 'C']})
+    throttled = update_store(['A', 'B', 'C'], str(tmp_path), bars.index[0],
+                             provider=ThrottledProvider(provider), batch_size=2,
+                             now=bars.index[-1] + pd.Timedelta(days=1))
+
+    assert [call[0] for call in provider.calls] == [('A', 'B'), ('C',)]
+    assert throttled.stats()['requests'] == 2
+    assert len(OHLCVStore(str(tmp_path)).load('C')) == 30
@@ -0,0 +1,103 @@
+import mmap
+import os
+import pandas as pd
+from data_store import OHLCVStore
+from market_cache import MarketCache
+from providers import FakeProvider
+from refresher import BackgroundRefresher
+from shared_snapshots import MANIFEST, SharedSnapshots, SnapshotPublisher
+from test_data_store import make_bars
+
+
+def make_refresher(tmp_path, bars, **kwargs):
+    provider = FakeProvider({'^GSPC': bars, '^NDX': bars * 2})
+    cache = MarketCache(OHLCVStore(str(tmp_path / "store")), provider, bars.index[0])
+    return BackgroundRefresher(cache, ['^GSPC', '^NDX'], **kwargs), provider
+
+
+# True if the array reads straight from a memory-mapped file
+def is_mapped(array):
+    while array is not None:
+        if isinstance(array, mmap.mmap):
+            return True
+        array = getattr(array, 'base', None)
+    return False
+
+
+def test_readers_map_published_snapshots_without_copying(tmp_path):
+    bars = make_bars('2020-01-01', 400)
+    refresher, _ = make_refresher(tmp_path, bars, publisher=SnapshotPublisher(str(tmp_path / "shared")))
+    now = bars.index[-1] + pd.Timedelta(days=1)
+    assert refresher.refresh(now)
+
+    reader = SharedSnapshots(str(tmp_path / "shared"))
+    reader.track(['^GSPC', '^NDX'])
+    assert reader.wait_ready(timeout=0) and not reader.stats()['leader']
+    for ticker in ['^GSPC', '^NDX']:
+        shared, local = reader.snapshot(ticker), refresher.snapshot(ticker)
+        pd.testing.assert_frame_equal(shared.daily, local.daily, check_freq=False)
+        for freq in ['W', 'ME', '2ME']:
+            pd.testing.assert_frame_equal(shared.window(freq, '2020-03-15'), local.window(freq, '2020-03-15'),
+                                          check_freq=False)
+        block = shared.daily._mgr.blocks[0].values
+        assert is_mapped(block) and not block.flags.writeable
+        assert is_mapped(shared.pyramid.levels['2ME']._mgr.blocks[0].values)
+
+    # Reads only stat the manifest until a new generation is published
+    snapshots = reader.snapshots(['^GSPC', '^NDX'])
+    assert reader.snapshots(['^GSPC', '^NDX']) == snapshots and reader.stats()['attaches'] == 2
+
+
+def test_new_versions_replace_only_changed_tickers(tmp_path):
+    bars = make_bars('2020-01-01', 400)
+    shared_dir = tmp_path / "shared"
+    refresher, provider = make_refresher(tmp_path, bars.iloc[:300], publisher=SnapshotPublisher(str(shared_dir)))
+    assert refresher.refresh(bars.index[299] + pd.Timedelta(days=1))
+    reader = SharedSnapshots(str(shared_dir))
+    first = reader.snapshots(['^GSPC', '^NDX'])
+
+    provider.frames['^GSPC'] = bars
+    for day in range(300, 302):
+        assert refresher.refresh(bars.index[day] + pd.Timedelta(days=1))
+    latest = reader.snapshots(['^GSPC', '^NDX'])
+    assert latest['^NDX'] is first['^NDX']
+    assert latest['^GSPC'].version == 3 and len(latest['^GSPC'].daily) == 302
+    assert reader.stats()['generation'] == 3
+
+    # Readers still on the old files keep working; files two versions old are removed
+    assert len(first['^GSPC'].daily) == 300
+    files = sorted(name for name in os.listdir(shared_dir) if name.startswith('^GSPC'))
+    assert [name.split('.')[1] for name in files] == ['2', '3']
+
+    # A restarted publisher continues the version numbers
+    SnapshotPublisher(str(shared_dir)).publish({'^GSPC': refresher.snapshot('^GSPC')})
+    assert reader.snapshot('^GSPC').version == 4
+
+
+def test_one_process_leads_and_errors_reach_every_reader(tmp_path):
+    bars = make_bars('2020-01-01', 100)
+    started = []
+
+    def start_refresher(publisher):
+        refresher, provider = make_refresher(tmp_path, bars, publisher=publisher)
+        started.append(provider)
+        return refresher
+
+    leader = SharedSnapshots(str(tmp_path / "shared"), start_refresher)
+    follower = SharedSnapshots(str(tmp_path / "shared"), start_refresher)
+    leader.track(['^GSPC'])
+    follower.track(['^GSPC'])
+    assert leader.stats()['leader'] and not follower.stats()['leader'] and len(started) == 1
+
+    assert not follower.wait_ready(timeout=0)
+    assert leader.refresher.refresh(bars.index[-1] + pd.Timedelta(days=1))
+    assert follower.wait_ready(timeout=0) and follower.snapshot('^GSPC').version == 1
+
+    def fail(*args):
+        raise ConnectionError("upstream down")
+    started[0].fetch_many = fail
+    leader.refresher.track(['^DJI'])
+    assert not leader.refresher.refresh(bars.index[-1] + pd.Timedelta(days=1))
+    assert follower.last_error == "^DJI: ConnectionError: upstream down"
+    assert follower.snapshot('^GSPC').version == 1
+    assert os.path.exists(tmp_path / "shared" / MANIFEST)
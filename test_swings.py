@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+from fib import calculate_fibonacci_levels
+from swings import SWING_HIGH, SWING_LOW, find_swings, last_swing_anchors
+
+
+def make_path(closes):
+    closes = np.asarray(closes, dtype=float)
+    index = pd.bdate_range('2024-01-01', periods=len(closes))
+    return pd.DataFrame({'Open': closes, 'High': closes, 'Low': closes, 'Close': closes}, index=index)
+
+
+def test_zigzag_confirms_pivots_past_threshold():
+    data = make_path([100, 104, 110, 108, 98, 97, 99, 103, 107, 106, 104])
+    positions, prices, kinds = find_swings(data['High'], data['Low'], threshold=0.05)
+
+    # The final rise to 107 is not confirmed: price never fell 5% below it
+    assert positions.tolist() == [0, 2, 5]
+    assert prices.tolist() == [100, 110, 97]
+    assert kinds.tolist() == [SWING_LOW, SWING_HIGH, SWING_LOW]
+
+    # Small wiggles below the threshold are ignored
+    assert len(find_swings(data['High'], data['Low'], threshold=0.5)[0]) == 0
+
+
+def test_swing_anchor_mode_uses_latest_pivots():
+    data = make_path([100, 130, 90, 120, 95, 110, 104])
+    assert last_swing_anchors(data, 0.1) == (120, 95)
+
+    down = calculate_fibonacci_levels(data, 'down', anchor='swing', threshold=0.1)
+    up = calculate_fibonacci_levels(data, 'up', anchor='swing', threshold=0.1)
+    assert (down['0%'], down['100%']) == (120, 95)
+    assert (up['0%'], up['100%']) == (95, 120)
+
+    # Without a significant swing the window extremes are used
+    flat = calculate_fibonacci_levels(data, 'down', anchor='swing', threshold=0.9)
+    assert flat == calculate_fibonacci_levels(data, 'down')
@@ -0,0 +1,117 @@
+import pandas as pd
+import pytest
+from data_store import OHLCVStore
+from market_cache import MarketCache
+from providers import FakeProvider
+from refresher import BackgroundRefresher
+from test_data_store import make_bars
+from throttle import Backoff, CircuitBreaker, CircuitOpenError, ThrottledProvider, TokenBucket
+
+
+# Fake time: sleeping advances the clock instantly
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class ThrottleError(Exception):
+    pass
+
+
+# Fake endpoint that answers 429 once requests arrive faster than `max_rate`
+class RateLimitedProvider(FakeProvider):
+    def __init__(self, frames, clock, max_rate):
+        super().__init__(frames)
+        self.clock = clock
+        self.min_gap = 1 / max_rate
+        self.last = None
+        self.rejected = 0
+
+    def fetch(self, ticker, start, end):
+        now = self.clock()
+        if self.last is not None and now - self.last < self.min_gap:
+            self.last = now
+            self.rejected += 1
+            raise ThrottleError("429 Too Many Requests")
+        self.last = now
+        return super().fetch(ticker, start, end)
+
+
+def make_provider(inner, clock, rate=10.0, **breaker):
+    return ThrottledProvider(inner,
+                             limiter=TokenBucket(rate=rate, burst=1, clock=clock, sleep=clock.sleep),
+                             backoff=Backoff(base=0.5, cap=8, rng=lambda: 1.0),
+                             breaker=CircuitBreaker(clock=clock, **breaker),
+                             max_retries=5, clock=clock, sleep=clock.sleep)
+
+
+def test_limiter_adapts_to_the_sustainable_rate():
+    clock = FakeClock()
+    bars = make_bars('2020-01-01', 20)
+    inner = RateLimitedProvider({'AAPL': bars}, clock, max_rate=2)
+    provider = make_provider(inner, clock, rate=10.0, failure_threshold=50)
+
+    for _ in range(40):
+        assert len(provider.fetch('AAPL', bars.index[0], bars.index[-1] + pd.Timedelta(days=1))) == 20
+
+    stats = provider.stats()
+    assert stats['throttles'] == inner.rejected > 0
+    assert stats['successes'] == 40 and stats['failures'] == 0
+    assert stats['retries'] == stats['throttles']
+    assert stats['retry_seconds'] > 0
+    assert provider.limiter.rate <= 2.5
+    # Once settled, most requests get through on the first try
+    assert inner.rejected < 10
+
+
+def test_breaker_fails_fast_and_refresher_keeps_last_snapshot(tmp_path):
+    clock = FakeClock()
+    bars = make_bars('2020-01-01', 300)
+    inner = FakeProvider({'^GSPC': bars})
+    provider = make_provider(inner, clock, failure_threshold=2, reset_timeout=60)
+    cache = MarketCache(OHLCVStore(str(tmp_path)), provider, bars.index[0])
+    refresher = BackgroundRefresher(cache, ['^GSPC'])
+    now = bars.index[-1] + pd.Timedelta(days=1)
+    assert refresher.refresh(now)
+    good = refresher.snapshot('^GSPC')
+
+    def down(*args):
+        raise ConnectionError("connection refused")
+    inner.fetch_many = down
+    later = now + pd.Timedelta(days=7)
+    assert not refresher.refresh(later)
+    assert provider.breaker.state == CircuitBreaker.OPEN
+    calls, rejected = provider.requests, provider.rejected
+
+    # While open no request reaches the upstream and the old data is served
+    assert not refresher.refresh(later)
+    assert provider.requests == calls
+    assert provider.stats()['rejected'] == rejected + 1
+    assert "circuit is open" in refresher.last_error
+    assert refresher.snapshot('^GSPC') is good
+
+    # After the reset timeout a single trial request closes it again
+    inner.fetch_many = FakeProvider({'^GSPC': make_bars('2020-01-01', 305)}).fetch_many
+    clock.now += 60
+    assert refresher.refresh(later)
+    assert provider.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_half_open_trial_failure_reopens():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+    breaker.record_failure()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    clock.now = 10
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()  # only one trial at a time
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
@@ -0,0 +1,42 @@
+from timing import Histogram, Timings
+
+
+def test_histogram_buckets_and_quantiles():
+    histogram = Histogram(buckets=(0.01, 0.1, 1.0))
+    for seconds in [0.005] * 50 + [0.05] * 45 + [0.5] * 4 + [2.0]:
+        histogram.observe(seconds)
+
+    assert histogram.counts == [50, 45, 4, 1]
+    assert histogram.quantile(0.5) == 0.01
+    assert 0.01 < histogram.quantile(0.95) <= 0.1
+    assert histogram.quantile(1.0) == 2.0
+    assert histogram.summary()['count'] == 100
+
+
+def test_spans_record_runs_and_export():
+    ticks = iter([0.0, 0.25, 1.0, 1.5, 2.0, 2.125])
+    timings = Timings(clock=lambda: next(ticks))
+    run = {}
+    with timings.span("chart_build", run):
+        pass
+    with timings.span("chart_build", run):
+        pass
+    with timings.span("fibonacci"):
+        pass
+
+    assert run == {'chart_build': 0.75}
+    assert timings.summary()['chart_build']['count'] == 2
+    text = timings.to_prometheus()
+    assert 'fib_dashboard_stage_seconds_bucket{stage="chart_build",le="0.25"} 1' in text
+    assert 'fib_dashboard_stage_seconds_bucket{stage="chart_build",le="+Inf"} 2' in text
+    assert 'fib_dashboard_stage_seconds_sum{stage="fibonacci"} 0.125' in text
+    assert '"count": 2' in timings.to_json()
+
+
+def test_disabled_spans_record_nothing():
+    timings = Timings(enabled=False)
+    run = {}
+    with timings.span("load_data", run):
+        pass
+    assert run == {} and timings.summary() == {}
+    assert timings.span("a") is timings.span("b")
@@ -0,0 +1,204 @@
+import random
+import threading
+import time
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+# Upstream errors that mean "slow down" rather than "broken"
+def is_throttle_error(error):
+    response = getattr(error, 'response', None)
+    if getattr(response, 'status_code', None) == 429:
+        return True
+    text = str(error).lower()
+    return '429' in text or 'too many requests' in text or 'rate limit' in text
+
+
+# Token bucket whose refill rate adapts to the upstream: it is halved on
+# every throttle and grows back slowly while requests succeed, so it settles
+# just under the highest rate the server tolerates
+class TokenBucket:
+    def __init__(self, rate=2.0, burst=5, min_rate=0.1, max_rate=None, recovery=1.05,
+                 clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.max_rate = max_rate or rate
+        self.recovery = recovery
+        self.clock = clock
+        self.sleep = sleep
+        self.waited = 0.0
+        self._tokens = float(burst)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    # Block until a request may be sent; returns the seconds spent waiting.
+    # The token is reserved up front (the balance may go negative) so
+    # concurrent callers queue up in order instead of polling.
+    def acquire(self):
+        with self._lock:
+            self._refill(self.clock())
+            self._tokens -= 1
+            delay = max(0.0, -self._tokens / self.rate)
+            self.waited += delay
+        if delay:
+            self.sleep(delay)
+        return delay
+
+    def on_success(self):
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate * self.recovery)
+
+    def on_throttle(self):
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+            self._tokens = min(self._tokens, 0.0)
+
+
+# Exponential backoff with full jitter: a random delay up to
+# base * 2**attempt, capped at `cap` seconds
+class Backoff:
+    def __init__(self, base=2.0, cap=60.0, rng=random.random):
+        self.base = base
+        self.cap = cap
+        self.rng = rng
+
+    def delay(self, attempt):
+        return self.rng() * min(self.cap, self.base * 2 ** attempt)
+
+
+# Stops calling a failing upstream. After `failure_threshold` consecutive
+# failures it opens for `reset_timeout` seconds, then lets a single trial
+# request through (half-open); that request closes or reopens it.
+class CircuitBreaker:
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+    def __init__(self, failure_threshold=5, reset_timeout=300, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.failures = 0
+        self.opened_at = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return self.CLOSED
+        if self.clock() - self.opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def before_call(self):
+        with self._lock:
+            state = self.state
+            if state == self.OPEN or (state == self.HALF_OPEN and self._trial):
+                retry_in = max(0.0, self.opened_at + self.reset_timeout - self.clock())
+                raise CircuitOpenError(f"Upstream circuit is open, retrying in {retry_in:.0f}s")
+            self._trial = state == self.HALF_OPEN
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._trial or self.failures >= self.failure_threshold:
+                self.opened_at = self.clock()
+            self._trial = False
+
+
+# Wraps a provider with rate limiting, retries and a circuit breaker. While
+# the breaker is open, calls fail fast with CircuitOpenError so the caller
+# keeps serving the data it already has.
+class ThrottledProvider:
+    def __init__(self, provider, limiter=None, backoff=None, breaker=None, max_retries=3,
+                 clock=time.monotonic, sleep=time.sleep):
+        self.provider = provider
+        self.limiter = limiter or TokenBucket(clock=clock, sleep=sleep)
+        self.backoff = backoff or Backoff()
+        self.breaker = breaker or CircuitBreaker(clock=clock)
+        self.max_retries = max_retries
+        self.clock = clock
+        self.sleep = sleep
+        self.requests = 0
+        self.successes = 0
+        self.failures = 0
+        self.throttles = 0
+        self.retries = 0
+        self.rejected = 0
+        self.retry_seconds = 0.0
+        self.max_retry_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def fetch(self, ticker, start, end):
+        return self._call(self.provider.fetch, ticker, start, end)
+
+    def fetch_many(self, tickers, start, end):
+        return self._call(self.provider.fetch_many, list(tickers), start, end)
+
+    def _count(self, **increments):
+        with self._lock:
+            for name, value in increments.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def _call(self, fetch, *args):
+        started = self.clock()
+        for attempt in range(self.max_retries):
+            try:
+                self.breaker.before_call()
+            except CircuitOpenError:
+                self._count(rejected=1)
+                raise
+            self.limiter.acquire()
+            self._count(requests=1)
+            try:
+                result = fetch(*args)
+            except Exception as e:
+                self.breaker.record_failure()
+                if is_throttle_error(e):
+                    self._count(throttles=1)
+                    self.limiter.on_throttle()
+                if attempt == self.max_retries - 1:  # Last attempt
+                    self._count(failures=1)
+                    raise
+                self._count(retries=1)
+                self.sleep(self.backoff.delay(attempt))
+                continue
+
+            self.breaker.record_success()
+            self.limiter.on_success()
+            self._count(successes=1)
+            if attempt:
+                elapsed = self.clock() - started
+                with self._lock:
+                    self.retry_seconds += elapsed
+                    self.max_retry_seconds = max(self.max_retry_seconds, elapsed)
+            return result
+
+    def stats(self):
+        return {
+            'requests': self.requests,
+            'successes': self.successes,
+            'failures': self.failures,
+            'throttles': self.throttles,
+            'retries': self.retries,
+            'rejected': self.rejected,
+            'retry_seconds': round(self.retry_seconds, 3),
+            'max_retry_seconds': round(self.max_retry_seconds, 3),
+            'rate_limit_wait': round(self.limiter.waited, 3),
+            'rate': round(self.limiter.rate, 3),
+            'breaker': self.breaker.state,
+        }
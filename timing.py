@@ -0,0 +1,131 @@
+import bisect
+import json
+import threading
+import time
+
+# Histogram bucket upper bounds in seconds, from a cache hit to a slow AI answer
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+# Latency histogram with fixed buckets, as Prometheus keeps them
+class Histogram:
+    __slots__ = ('buckets', 'counts', 'count', 'total', 'max')
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    # Estimate a quantile by interpolating inside its bucket
+    def quantile(self, q):
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                lower = self.buckets[i - 1] if i else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.max
+                return min(lower + (upper - lower) * (rank - seen) / count, self.max)
+            seen += count
+        return self.max
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'mean': self.total / self.count if self.count else 0.0,
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95),
+            'max': self.max,
+        }
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ('timings', 'name', 'run', 'started')
+
+    def __init__(self, timings, name, run):
+        self.timings = timings
+        self.name = name
+        self.run = run
+
+    def __enter__(self):
+        self.started = self.timings.clock()
+        return self
+
+    def __exit__(self, *exc):
+        self.timings.record(self.name, self.timings.clock() - self.started, self.run)
+        return False
+
+
+# Per-stage latency histograms for the whole process. `span(name, run)`
+# times a block and, when a `run` dict is given, also adds the time to it
+# so a single script run can be shown. Disabled, span() returns a shared
+# no-op context manager.
+class Timings:
+    def __init__(self, enabled=True, buckets=DEFAULT_BUCKETS, clock=time.perf_counter):
+        self.enabled = enabled
+        self.buckets = tuple(buckets)
+        self.clock = clock
+        self.histograms = {}
+        self._lock = threading.Lock()
+
+    def span(self, name, run=None):
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, run)
+
+    def record(self, name, seconds, run=None):
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram(self.buckets)
+            histogram.observe(seconds)
+        if run is not None:
+            run[name] = run.get(name, 0.0) + seconds
+
+    def summary(self):
+        with self._lock:
+            return {name: histogram.summary() for name, histogram in self.histograms.items()}
+
+    def to_json(self):
+        with self._lock:
+            stages = {
+                name: {**histogram.summary(), 'sum': histogram.total,
+                       'buckets': dict(zip([*map(str, histogram.buckets), '+Inf'], histogram.counts))}
+                for name, histogram in self.histograms.items()
+            }
+        return json.dumps({'stages': stages}, indent=2)
+
+    # Prometheus text exposition format, one histogram labelled by stage
+    def to_prometheus(self, metric='fib_dashboard_stage_seconds'):
+        lines = [f"# HELP {metric} Time spent in each dashboard stage.", f"# TYPE {metric} histogram"]
+        with self._lock:
+            for name, histogram in sorted(self.histograms.items()):
+                cumulative = 0
+                for bound, count in zip([*map(repr, histogram.buckets), '+Inf'], histogram.counts):
+                    cumulative += count
+                    lines.append(f'{metric}_bucket{{stage="{name}",le="{bound}"}} {cumulative}')
+                lines.append(f'{metric}_sum{{stage="{name}"}} {histogram.total!r}')
+                lines.append(f'{metric}_count{{stage="{name}"}} {histogram.count}')
+        return '\n'.join(lines) + '\n'